@@ -1,7 +1,13 @@
 import argparse
+import functools
 import logging
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple, List
+from typing import Optional, Tuple, List
 
 import numpy as np
 from PIL import Image
@@ -15,6 +21,47 @@ except Exception as e:  # pragma: no cover - opzionale in ambienti senza opencv
 else:
     _cv2_import_error = None
 
+# Fattore di scala della risoluzione di lavoro per la stima della maschera:
+# la geometria delle balloon è ben risolta anche a metà risoluzione (¼ dei pixel)
+MASK_WORK_SCALE = 0.5
+
+# Sotto questa soglia di pixel il trasferimento host<->device e la morfologia
+# CUDA con kernel piccoli non ripagano: si resta su CPU
+CUDA_MIN_PIXELS = 4_000_000
+
+# Livello zlib per i PNG di output: 1 è molto più veloce del default di PIL (6)
+# a fronte di file poco più grandi
+DEFAULT_PNG_LEVEL = 1
+
+# Auto-DPI: se alla risoluzione minima la prima pagina produce almeno questo
+# numero di balloon, la risoluzione minima è sufficiente per tutto il PDF
+AUTO_DPI_MIN_BUBBLES = 3
+
+# Parametri del filtro balloon, condivisi da percorso CPU, CUDA e Numba
+CANNY_LOW, CANNY_HIGH = 60, 160
+MIN_AREA_FRAC = 0.002  # area minima rispetto alla pagina
+MAX_AREA_FRAC = 0.35  # area massima rispetto alla pagina
+MIN_ROUNDNESS = 0.12
+MIN_SOLIDITY = 0.6
+TEXT_DARK_THRESHOLD = 130  # luma sotto cui un pixel è considerato testo
+MIN_TEXT_RATIO = 0.01
+
+# LUT 256 -> {0, 1} per classificare i pixel scuri (testo): un solo lookup
+# vettorizzato, sostituibile in futuro da soglie più elaborate senza toccare il kernel
+_TEXT_LUT = (np.arange(256) < TEXT_DARK_THRESHOLD).astype(np.uint8)
+
+# Elementi strutturanti condivisi tra tutte le pagine
+_SE3 = np.ones((3, 3), np.uint8)
+_SE5 = np.ones((5, 5), np.uint8)
+_SE5_ELLIPSE = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5)) if cv2 is not None else None
+
+
+def cuda_available() -> bool:
+    try:
+        return cv2 is not None and hasattr(cv2, "cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except Exception:
+        return False
+
 
 def _ensure_outdir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
@@ -32,112 +79,309 @@ def cv_to_pil(img: np.ndarray) -> Image.Image:
     return Image.fromarray(img[:, :, ::-1])
 
 
-def build_bubble_mask(gray: np.ndarray) -> np.ndarray:
-    """Stima una maschera delle balloon su un'immagine in toni di grigio.
-
-    Strategia robusta ma classica:
-    - smoothing leggero per ridurre il rumore
-    - threshold adattivo per separare sfondo chiaro/segni neri
-    - canny + dilatazione per chiudere i contorni
-    - ricerca dei contorni e filtro per area/rotondità/solidity
-    - verifica presenza di testo (pixel scuri) all'interno
-    """
-    h, w = gray.shape[:2]
-
+def _edges_cpu(gray: np.ndarray) -> np.ndarray:
     # Pre-filter per attenuare retinature
     blur = cv2.GaussianBlur(gray, (5, 5), 0)
 
     # Edge map dei bordi neri delle balloon
-    edges = cv2.Canny(blur, 60, 160)
-    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=1)
+    edges = cv2.Canny(blur, CANNY_LOW, CANNY_HIGH)
+    edges = cv2.dilate(edges, _SE3, iterations=1)
 
     # Chiudi piccoli buchi nei contorni
-    edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8), iterations=1)
+    return cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _SE5, iterations=1)
+
+
+# Gli oggetti filtro CUDA mantengono stato e buffer sul device: vanno creati
+# una sola volta per processo e riusati su tutte le pagine
+@functools.lru_cache(maxsize=1)
+def _cuda_blur():
+    return cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_canny():
+    return cv2.cuda.createCannyEdgeDetector(CANNY_LOW, CANNY_HIGH)
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_dilate():
+    return cv2.cuda.createMorphologyFilter(cv2.MORPH_DILATE, cv2.CV_8UC1, _SE3)
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_close():
+    return cv2.cuda.createMorphologyFilter(cv2.MORPH_CLOSE, cv2.CV_8UC1, _SE5)
+
+
+def _edges_cuda(gray: np.ndarray) -> Optional[np.ndarray]:
+    """Stessa catena di `_edges_cpu` eseguita su GPU: un solo upload e un solo
+    download per pagina. Restituisce None in caso di errore (fallback su CPU)."""
+    try:
+        stream = cv2.cuda_Stream()
+        gpu_gray = cv2.cuda_GpuMat()
+        gpu_gray.upload(gray, stream=stream)
+        blur = _cuda_blur().apply(gpu_gray, stream=stream)
+        edges = _cuda_canny().detect(blur, stream=stream)
+        edges = _cuda_dilate().apply(edges, stream=stream)
+        edges = _cuda_close().apply(edges, stream=stream)
+        out = edges.download(stream=stream)
+        stream.waitForCompletion()
+        return out
+    except Exception as e:
+        logging.debug(f"Pipeline CUDA non disponibile, uso CPU: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _numba_label_scorer():
+    """Compila (una volta per processo) il kernel Numba che conta pixel e pixel
+    scuri per etichetta in un'unica passata. None se Numba non è installato."""
+    try:
+        import numba  # type: ignore
+    except Exception:
+        return None
+
+    @numba.njit(parallel=True, cache=True)
+    def score_labels(labels, gray, num, lut):
+        h, w = labels.shape
+        # Istogrammi parziali per blocco di righe: niente race tra thread
+        nchunks = min(h, 64)
+        areas = np.zeros((nchunks, num), np.int64)
+        darks = np.zeros((nchunks, num), np.int64)
+        for c in numba.prange(nchunks):
+            for i in range(c * h // nchunks, (c + 1) * h // nchunks):
+                for j in range(w):
+                    label = labels[i, j]
+                    areas[c, label] += 1
+                    darks[c, label] += lut[gray[i, j]]
+        return areas.sum(axis=0), darks.sum(axis=0)
+
+    return score_labels
+
+
+def _score_labels(labels: np.ndarray, gray: np.ndarray, num: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Restituisce (pixel totali, pixel scuri) per ciascuna etichetta."""
+    scorer = _numba_label_scorer()
+    if scorer is not None:
+        return scorer(labels, gray, num, _TEXT_LUT)
+    flat = labels.ravel()
+    areas = np.bincount(flat, minlength=num)
+    # Pixel scuri ~ testo
+    dark = cv2.LUT(gray, _TEXT_LUT)
+    darks = np.bincount(flat, weights=dark.ravel().view(np.bool_), minlength=num)
+    return areas, darks
 
-    # Trova contorni
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    # Maschera finale
-    mask = np.zeros((h, w), dtype=np.uint8)
-
-    # Prepara mappe per controlli
-    # Pixel scuri ~ testo
-    text_mask = (gray < 130).astype(np.uint8) * 255
+def _geometric_candidates(contours, img_area: int) -> List[np.ndarray]:
+    """Filtra i contorni per area/rotondità/solidity con operazioni vettoriali.
 
-    for cnt in contours:
-        area = cv2.contourArea(cnt)
-        if area < (w * h) * 0.002 or area > (w * h) * 0.35:
-            continue
-        peri = cv2.arcLength(cnt, True)
-        if peri == 0:
-            continue
-        roundness = 4 * np.pi * (area / (peri * peri))
-        # App rossimazione a elisse/non spigoloso
-        if roundness < 0.12:  # troppo spigoloso -> prob. vignetta, non balloon
+    Area e perimetro sono calcolati in blocco e scartati con maschere NumPy;
+    `convexHull` (il passo più costoso) viene chiamato solo sui superstiti.
+    """
+    if not contours:
+        return []
+    areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+    idx = np.flatnonzero((areas >= img_area * MIN_AREA_FRAC) & (areas <= img_area * MAX_AREA_FRAC))
+    if idx.size == 0:
+        return []
+    peris = np.fromiter((cv2.arcLength(contours[i], True) for i in idx), dtype=np.float64, count=idx.size)
+    areas = areas[idx]
+    roundness = 4 * np.pi * areas / np.maximum(peris * peris, 1e-12)
+    # Approssimazione a elisse/non spigoloso: sotto soglia è prob. una vignetta, non una balloon
+    keep = (peris > 0) & (roundness >= MIN_ROUNDNESS)
+
+    candidates: List[np.ndarray] = []
+    for i, area, r in zip(idx[keep], areas[keep], roundness[keep]):
+        cnt = contours[i]
+        # L'inviluppo convesso ha perimetro <= P, quindi area_hull <= P²/4π e
+        # solidity = area/area_hull >= roundness: sopra MIN_SOLIDITY il test è già superato
+        if r >= MIN_SOLIDITY:
+            candidates.append(cnt)
             continue
-        hull = cv2.convexHull(cnt)
-        hull_area = cv2.contourArea(hull)
+        hull_area = cv2.contourArea(cv2.convexHull(cnt))
         if hull_area == 0:
             continue
-        solidity = float(area) / float(hull_area)
-        if solidity < 0.6:
+        if area / hull_area < MIN_SOLIDITY:
             continue
+        candidates.append(cnt)
+    return candidates
 
-        # Crea una maschera temporanea della regione candidata
-        temp = np.zeros_like(mask)
-        cv2.drawContours(temp, [cnt], -1, 255, thickness=-1)
 
-        # Verifica presenza di testo (abbastanza pixel scuri all'interno)
-        inter = cv2.bitwise_and(text_mask, text_mask, mask=temp)
-        text_ratio = float(cv2.countNonZero(inter)) / float(area + 1e-6)
-        if text_ratio < 0.01:
-            # Probabile balloon vuota, vignetta o fumetto decorativo
-            continue
+def build_bubble_mask(gray: np.ndarray, use_cuda: bool = False) -> np.ndarray:
+    """Stima una maschera delle balloon su un'immagine in toni di grigio.
+
+    Strategia robusta ma classica:
+    - smoothing leggero per ridurre il rumore
+    - threshold adattivo per separare sfondo chiaro/segni neri
+    - canny + dilatazione per chiudere i contorni
+    - ricerca dei contorni e filtro per area/rotondità/solidity
+    - verifica presenza di testo (pixel scuri) all'interno
+    """
+    h, w = gray.shape[:2]
 
-        mask = cv2.bitwise_or(mask, temp)
+    edges = None
+    if use_cuda and h * w > CUDA_MIN_PIXELS:
+        edges = _edges_cuda(gray)
+    if edges is None:
+        edges = _edges_cpu(gray)
 
-    # Finitura maschera: smussa e riempi piccoli buchi
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8), iterations=1)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8), iterations=1)
-    return mask
+    # Trova contorni
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
+    # Maschera finale
+    mask = np.zeros((h, w), dtype=np.uint8)
 
-def extract_bubbles_from_pil(pil_img: Image.Image) -> Image.Image:
+    candidates = _geometric_candidates(contours, w * h)
+    if candidates:
+        # Etichetta ogni regione candidata (i contorni esterni non si annidano) e
+        # conta pixel totali e pixel scuri per etichetta in un'unica passata
+        labels = np.zeros((h, w), dtype=np.int32)
+        for label, cnt in enumerate(candidates, start=1):
+            cv2.drawContours(labels, [cnt], -1, label, thickness=-1)
+        areas, darks = _score_labels(labels, gray, len(candidates) + 1)
+        text_ratio = darks / np.maximum(areas, 1)
+
+        # Verifica presenza di testo (abbastanza pixel scuri all'interno):
+        # sotto MIN_TEXT_RATIO è prob. una balloon vuota, una vignetta o un fumetto decorativo
+        accepted = [cnt for label, cnt in enumerate(candidates, start=1) if text_ratio[label] >= MIN_TEXT_RATIO]
+        if accepted:
+            cv2.drawContours(mask, accepted, -1, 255, thickness=-1)
+
+    # Finitura maschera: riempi piccoli buchi e smussa i bordi. La maschera nasce
+    # da contorni pieni, senza rumore sale/pepe, quindi un'apertura non serve
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _SE5_ELLIPSE, iterations=1)
+
+
+def estimate_bubble_mask(gray: np.ndarray, scale: float = MASK_WORK_SCALE, use_cuda: bool = False) -> np.ndarray:
+    """Calcola la maschera su una versione ridotta di `gray` e la riporta
+    alla risoluzione originale. Le soglie d'area di `build_bubble_mask` sono
+    relative a w*h, quindi si adattano da sole alla scala di lavoro."""
+    h, w = gray.shape[:2]
+    if scale >= 1.0:
+        return build_bubble_mask(gray, use_cuda=use_cuda)
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    mask_small = build_bubble_mask(small, use_cuda=use_cuda)
+    mask = cv2.resize(mask_small, (w, h), interpolation=cv2.INTER_NEAREST)
+    # Ammorbidisce la scalettatura introdotta dall'upscale nearest
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _SE5, iterations=1)
+
+
+def _segment_page(pil_img: Image.Image, use_cuda: bool = False) -> Tuple[Image.Image, np.ndarray, np.ndarray]:
+    """Restituisce (balloon RGBA, maschera, grigio): la preview di debug può
+    così riusare maschera e luma senza ricalcolarle."""
     if cv2 is None:
         raise RuntimeError(
             f"OpenCV non disponibile: {repr(_cv2_import_error)}. Installa 'opencv-python-headless' per usare questo script."
         )
-    # Converti e costruisci maschera
-    cv_img = pil_to_cv(pil_img)
-    gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-    mask = build_bubble_mask(gray)
-
-    # Applica maschera per ottenere PNG trasparente
-    rgba = pil_img.convert("RGBA")
-    alpha = Image.fromarray(mask)
-    # Mantieni completamente opaco dentro le balloon, trasparente altrove
-    out = Image.new("RGBA", rgba.size, (0, 0, 0, 0))
-    out.paste(rgba, (0, 0), mask=alpha)
-    return out
-
-
-def process_pdf(input_pdf: Path, out_dir: Path, dpi: int = 300, debug: bool = False) -> List[Path]:
+    # Luma direttamente da PIL (stessi pesi 0.299/0.587/0.114), senza passare da BGR
+    gray = np.asarray(pil_img.convert("L"))
+    mask = estimate_bubble_mask(gray, use_cuda=use_cuda)
+
+    # Applica maschera per ottenere PNG trasparente. La maschera è binaria (0/255):
+    # un AND con i canali colore lascia intatto l'interno e azzera l'esterno
+    # (nero trasparente) in un'unica passata, scrivendo direttamente nel buffer RGBA
+    if pil_img.mode == "RGBA":
+        rgba = np.array(pil_img)
+        rgb = rgba[:, :, :3]
+    else:
+        rgb = np.asarray(pil_img if pil_img.mode == "RGB" else pil_img.convert("RGB"))
+        rgba = np.empty(rgb.shape[:2] + (4,), dtype=np.uint8)
+    np.bitwise_and(rgb, mask[:, :, None], out=rgba[:, :, :3])
+    rgba[:, :, 3] = mask
+    return Image.fromarray(rgba, "RGBA"), mask, gray
+
+
+def extract_bubbles_from_pil(pil_img: Image.Image, use_cuda: bool = False) -> Image.Image:
+    return _segment_page(pil_img, use_cuda=use_cuda)[0]
+
+
+def _default_workers() -> int:
+    return min(os.cpu_count() or 1, 4)
+
+
+def _init_worker(cv_threads: int) -> None:
+    # Bilancia il parallelismo interno di OpenCV con quello del pool di processi:
+    # senza limite ogni worker proverebbe a usare tutti i core
+    if cv2 is not None:
+        cv2.setNumThreads(cv_threads)
+    # Stesso limite per i thread del kernel Numba (prange), altrimenti ogni worker ne avvia uno per core
+    if _numba_label_scorer() is not None:
+        import numba  # type: ignore
+        numba.set_num_threads(min(cv_threads, numba.config.NUMBA_NUM_THREADS))
+
+
+def _process_page(page_path: str, out_path: Path, preview_path: Optional[Path], use_cuda: bool, png_level: int) -> Path:
+    """Elabora una singola pagina nel worker e scrive direttamente PNG e preview:
+    al processo principale torna solo il path, nessuna immagine attraversa l'IPC."""
+    with Image.open(page_path) as pil_page:
+        pil_page.load()
+        bubbles, preview_bytes = _process_loaded_page(pil_page, preview_path is not None, use_cuda)
+    bubbles.save(out_path, format="PNG", compress_level=png_level, optimize=False)
+    if preview_bytes is not None:
+        preview_path.write_bytes(preview_bytes)
+    try:
+        os.unlink(page_path)
+    except OSError:
+        pass
+    return out_path
+
+
+def _process_loaded_page(pil_page: Image.Image, debug: bool, use_cuda: bool) -> Tuple[Image.Image, Optional[bytes]]:
+    bubbles, mask, gray = _segment_page(pil_page, use_cuda=use_cuda)
+    preview_bytes = None
+    if debug:
+        # Esporta anche una preview con contorni, riusando la maschera già calcolata
+        preview = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        preview[mask > 0] = (0, 255, 0)
+        ok, buf = cv2.imencode(".jpg", preview)
+        if ok:
+            preview_bytes = buf.tobytes()
+    return bubbles, preview_bytes
+
+
+def pick_dpi(input_pdf: Path, min_dpi: int = 150, max_dpi: int = 300, use_cuda: bool = False) -> int:
+    """Sceglie la DPI più bassa sufficiente: rasterizza la prima pagina a `min_dpi`
+    e, se non emergono abbastanza balloon, ripiega su `max_dpi`."""
+    pages = convert_from_path(str(input_pdf), dpi=min_dpi, first_page=1, last_page=1)
+    if not pages:
+        return max_dpi
+    _, mask, _ = _segment_page(pages[0], use_cuda=use_cuda)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    found = len(contours)
+    dpi = min_dpi if found >= AUTO_DPI_MIN_BUBBLES else max_dpi
+    logging.info(f"Auto-DPI: {found} balloon a {min_dpi} DPI sulla prima pagina -> uso {dpi} DPI")
+    return dpi
+
+
+def process_pdf(
+    input_pdf: Path,
+    out_dir: Path,
+    dpi: int = 300,
+    debug: bool = False,
+    workers: Optional[int] = None,
+    use_cuda: bool = False,
+    png_level: int = DEFAULT_PNG_LEVEL,
+) -> List[Path]:
     _ensure_outdir(out_dir)
-    pages = convert_from_path(str(input_pdf), dpi=dpi)
-    outputs: List[Path] = []
-    for i, pil_page in enumerate(pages, start=1):
-        bubbles = extract_bubbles_from_pil(pil_page)
-        out_path = out_dir / f"page-{i:03d}_bubbles.png"
-        bubbles.save(out_path)
-        outputs.append(out_path)
-        if debug and cv2 is not None:
-            # Esporta anche una preview con contorni
-            cv_img = pil_to_cv(pil_page)
-            gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-            mask = build_bubble_mask(gray)
-            preview = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-            preview[mask > 0] = (0, 255, 0)
-            cv2.imwrite(str(out_dir / f"page-{i:03d}_preview.jpg"), preview)
+    workers = max(1, workers or _default_workers())
+    # fork non è sicuro su macOS/Windows con OpenCV: usa spawn
+    mp_context = mp.get_context("spawn") if sys.platform in ("darwin", "win32") else None
+    with tempfile.TemporaryDirectory(prefix="bubbles_") as td:
+        # Le pagine vengono rasterizzate su disco e ogni worker scrive i propri output:
+        # in RAM resta al massimo una pagina per worker, qualunque sia il numero di pagine
+        page_paths = convert_from_path(
+            str(input_pdf), dpi=dpi, output_folder=td, paths_only=True, thread_count=os.cpu_count() or 1
+        )
+        cv_threads = max(1, (os.cpu_count() or 1) // workers)
+        n = len(page_paths)
+        out_paths = [out_dir / f"page-{i:03d}_bubbles.png" for i in range(1, n + 1)]
+        preview_paths = [out_dir / f"page-{i:03d}_preview.jpg" if debug else None for i in range(1, n + 1)]
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp_context, initializer=_init_worker, initargs=(cv_threads,)
+        ) as ex:
+            outputs = list(
+                ex.map(_process_page, page_paths, out_paths, preview_paths, [use_cuda] * n, [png_level] * n)
+            )
     return outputs
 
 
@@ -156,12 +400,40 @@ def main():
         help="Cartella output (default: prova-segmentation)",
     )
     parser.add_argument("--dpi", type=int, default=300, help="DPI di rasterizzazione per il PDF")
+    parser.add_argument(
+        "--auto-dpi",
+        action="store_true",
+        help="Sceglie automaticamente la DPI più bassa che riconosce le balloon sulla prima pagina (ignora --dpi)",
+    )
+    parser.add_argument("--min-dpi", type=int, default=150, help="DPI provata per prima con --auto-dpi (default: 150)")
+    parser.add_argument("--max-dpi", type=int, default=300, help="DPI di ripiego con --auto-dpi (default: 300)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=_default_workers(),
+        help="Processi paralleli per l'elaborazione delle pagine (default: min(CPU, 4))",
+    )
+    parser.add_argument(
+        "--png-level",
+        type=int,
+        default=DEFAULT_PNG_LEVEL,
+        metavar="0-9",
+        help=f"Compressione zlib dei PNG di output (0=nessuna, 9=massima; default: {DEFAULT_PNG_LEVEL})",
+    )
+    parser.add_argument("--cuda", action="store_true", help="Usa la GPU (cv2.cuda) per blur/Canny/morfologia se disponibile")
     parser.add_argument("-v", "--verbose", action="store_true", help="Log dettagliati")
     parser.add_argument("--debug", action="store_true", help="Esporta immagini di debug")
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s - %(message)s")
 
+    if args.workers < 1:
+        logging.error(f"--workers deve essere >= 1, ricevuto: {args.workers}")
+        return 1
+    if not 0 <= args.png_level <= 9:
+        logging.error(f"--png-level deve essere tra 0 e 9, ricevuto: {args.png_level}")
+        return 1
+
     in_pdf = Path(args.input)
     out_dir = Path(args.out_dir)
     if not in_pdf.exists():
@@ -174,8 +446,23 @@ def main():
         )
         return 1
 
+    use_cuda = False
+    if args.cuda:
+        use_cuda = cuda_available()
+        if not use_cuda:
+            logging.warning("CUDA richiesto ma non disponibile in OpenCV: proseguo su CPU")
+
+    dpi = args.dpi
+    if args.auto_dpi:
+        if not 0 < args.min_dpi <= args.max_dpi:
+            logging.error(f"Serve 0 < --min-dpi <= --max-dpi, ricevuto: {args.min_dpi}/{args.max_dpi}")
+            return 1
+        dpi = pick_dpi(in_pdf, min_dpi=args.min_dpi, max_dpi=args.max_dpi, use_cuda=use_cuda)
+
     logging.info(f"Estrazione balloon da {in_pdf.name} -> {out_dir}")
-    outputs = process_pdf(in_pdf, out_dir, dpi=args.dpi, debug=args.debug)
+    outputs = process_pdf(
+        in_pdf, out_dir, dpi=dpi, debug=args.debug, workers=args.workers, use_cuda=use_cuda, png_level=args.png_level
+    )
     logging.info(f"Generate {len(outputs)} immagini di balloon")
     return 0
 
@@ -2,19 +2,24 @@ import os
 import sys
 import json
 import math
+import shutil
 import time
+from collections import deque
 from pathlib import Path
-from threading import Thread
+from threading import Event, Lock
 from typing import Optional
-from PySide6.QtCore import Qt, Signal, QObject, QEvent, QTimer, QSize, QPointF
-from PySide6.QtGui import QIcon, QDragEnterEvent, QDropEvent, QPixmap, QPainter, QTransform, QMouseEvent, QWheelEvent, QCursor
+from PySide6.QtCore import Qt, Signal, Slot, QObject, QEvent, QTimer, QSize, QPointF, QRunnable, QThreadPool, QUrl
+from PySide6.QtGui import QDesktopServices, QIcon, QDragEnterEvent, QDropEvent, QImage, QPixmap, QPixmapCache, QPainter, QTransform, QMouseEvent, QWheelEvent, QCursor
 from PySide6.QtSvg import QSvgRenderer
-from PySide6.QtWidgets import QApplication, QWidget, QFileDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QListWidget, QListWidgetItem, QComboBox, QSpinBox, QSlider, QProgressBar, QLineEdit, QMessageBox, QCheckBox, QAbstractItemView, QDoubleSpinBox, QButtonGroup, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
+from PySide6.QtWidgets import QApplication, QWidget, QFileDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QListWidget, QListWidgetItem, QComboBox, QSpinBox, QSlider, QProgressBar, QLineEdit, QMessageBox, QCheckBox, QAbstractItemView, QDoubleSpinBox, QButtonGroup, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QGraphicsItem
 from modules import DEVICE_PROFILES, COMPRESSION_MODES, DEFAULT_QUALITY, DEFAULT_MAX_COLORS, PDFExtractor, ImageProcessor
 from PIL import Image
 import tempfile
 from manga_compressor import MangaCompressorModular, parse_output_filename, load_default_config, save_default_config
 
+_STYLE_LIGHT = '\n            QWidget { background: #f7f7f7; color: #1f2937; }\n            QLineEdit, QListWidget { background: #ffffff; border: 1px solid #d1d5db; padding: 6px; }\n            /* Imposta esplicitamente colori delle righe per evitare righe nere */\n            QListWidget { alternate-background-color: #f9fafb; }\n            QListWidget::item { background: #ffffff; color: #111827; }\n            QListWidget::item:alternate { background: #f9fafb; }\n            /* Evidenziazione lista file (light) */\n            QListWidget::item:hover { background: #f3f4f6; }\n            QListWidget::item:selected { background: #dbeafe; color: #111827; }\n            QListWidget::item:selected:!active { background: #e5effe; color: #1f2937; }\n            QComboBox, QSpinBox, QSlider { background: #ffffff; border: 1px solid #d1d5db; padding: 3px; }\n            QPushButton { background: #e5e7eb; border: 1px solid #cbd5e1; padding: 6px 10px; border-radius: 6px; }\n            QPushButton:hover { background: #dfe3ea; }\n            QPushButton:disabled { background: #e5e7eb; color: #9ca3af; }\n            QProgressBar { background: #ffffff; border: 1px solid #d1d5db; border-radius: 6px; text-align: center; }\n            QProgressBar::chunk { background: #3b82f6; }\n            QLabel { color: #111827; }\n            /* Checkbox visibile su tema chiaro */\n            QCheckBox::indicator { width: 16px; height: 16px; border: 1px solid #6b7280; background: #ffffff; border-radius: 3px; }\n            QCheckBox::indicator:checked { background: #2563eb; border: 1px solid #1d4ed8; }\n            /* Preset attivo */\n            QPushButton[preset="true"]:checked { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            QPushButton[preset="true"]:hover { background: #3b82f6; color: white; }\n            QPushButton[preset="true"]:checked:hover { background: #1d4ed8; color: white; }\n\n            /* Bottoni colorati */\n            #startButton { background: #16a34a; color: white; border: 1px solid #15803d; }\n            #startButton:hover { background: #22c55e; }\n            #stopButton { background: #dc2626; color: white; border: 1px solid #b91c1c; }\n            #stopButton:hover { background: #ef4444; }\n            #stopButton:disabled { background: #e5e7eb; color: #9ca3af; border: 1px solid #cbd5e1; }\n            #openOutputButton { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            #openOutputButton:hover { background: #3b82f6; }\n            #removeButton, #clearButton { background: #b45309; color: white; border: 1px solid #92400e; }\n            #removeButton:hover, #clearButton:hover { background: #d97706; }\n            #removeButton:disabled, #clearButton:disabled { background: #e5e7eb; color: #9ca3af; border: 1px solid #cbd5e1; }\n\n            /* pulsanti spinbox standard */\n            QSpinBox::up-button { subcontrol-origin: border; subcontrol-position: top right; }\n            QSpinBox::down-button { subcontrol-origin: border; subcontrol-position: bottom right; }\n            '
+_STYLE_DARK = '\n            QWidget { background: #0f1419; color: #eef2f5; }\n            QLineEdit, QListWidget { background: #1b2229; border: 1px solid #2b3540; padding: 6px; }\n            /* Evidenziazione lista file (dark) */\n            QListWidget::item:hover { background: #25303a; }\n            QListWidget::item:selected { background: #1e3a8a; color: #ffffff; }\n            QListWidget::item:selected:!active { background: #1f2a44; color: #ffffff; }\n            QComboBox, QSpinBox, QSlider { background: #1b2229; border: 1px solid #2b3540; padding: 3px; }\n            QPushButton { background: #2b3540; border: 1px solid #3a4653; padding: 6px 10px; border-radius: 6px; }\n            QPushButton:hover { background: #354252; }\n            QPushButton:disabled { background: #20262d; color: #8b98a5; }\n            QProgressBar { background: #1b2229; border: 1px solid #2b3540; border-radius: 6px; text-align: center; }\n            QProgressBar::chunk { background: #00bcd4; }\n            QLabel { color: #c9d1d9; }\n            /* Preset attivo */\n            QPushButton[preset="true"]:checked { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            QPushButton[preset="true"]:checked:hover { background: #3b82f6; color: white; }\n\n            /* Bottoni colorati */\n            #startButton { background: #16a34a; color: white; border: 1px solid #15803d; }\n            #startButton:hover { background: #22c55e; }\n            #stopButton { background: #b91c1c; color: white; border: 1px solid #991b1b; }\n            #stopButton:hover { background: #dc2626; }\n            #stopButton:disabled { background: #20262d; color: #8b98a5; border: 1px solid #3a4653; }\n            #openOutputButton { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            #openOutputButton:hover { background: #3b82f6; }\n            #removeButton, #clearButton { background: #b45309; color: white; border: 1px solid #92400e; }\n            #removeButton:hover, #clearButton:hover { background: #d97706; }\n            #removeButton:disabled, #clearButton:disabled { background: #20262d; color: #8b98a5; border: 1px solid #3a4653; }\n\n            /* pulsanti spinbox standard */\n            QSpinBox::up-button { subcontrol-origin: border; subcontrol-position: top right; }\n            QSpinBox::down-button { subcontrol-origin: border; subcontrol-position: bottom right; }\n            '
+
 class PreviewSyncController(QObject):
     changed = Signal()
 
@@ -25,21 +30,42 @@ class PreviewSyncController(QObject):
         self.cy = 0.5
         self._views = []
         self._updating = False
+        self._pending_zoom = None
+        self._pending_center = None
+        # Rotella e trascinamento arrivano molto più spesso del refresh dello schermo:
+        # si tiene solo l'ultimo valore e le viste si ridisegnano al più una volta per frame
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(16)
+        self._frame_timer.timeout.connect(self._flush_pending)
 
     def register(self, view: 'ImageZoomView'):
         if view not in self._views:
             self._views.append(view)
 
     def set_zoom_rel(self, zoom_rel: float):
-        self.zoom_rel = max(1.0, min(zoom_rel, 20.0))
-        self._notify()
+        self._pending_zoom = max(1.0, min(zoom_rel, 20.0))
+        self._schedule()
 
     def multiply_zoom(self, factor: float):
-        self.set_zoom_rel(self.zoom_rel * factor)
+        current = self.zoom_rel if self._pending_zoom is None else self._pending_zoom
+        self.set_zoom_rel(current * factor)
 
     def set_center_ratio(self, cx: float, cy: float):
-        self.cx = max(0.0, min(cx, 1.0))
-        self.cy = max(0.0, min(cy, 1.0))
+        self._pending_center = (max(0.0, min(cx, 1.0)), max(0.0, min(cy, 1.0)))
+        self._schedule()
+
+    def _schedule(self):
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+
+    def _flush_pending(self):
+        if self._pending_zoom is not None:
+            self.zoom_rel = self._pending_zoom
+            self._pending_zoom = None
+        if self._pending_center is not None:
+            self.cx, self.cy = self._pending_center
+            self._pending_center = None
         self._notify()
 
     def _notify(self):
@@ -61,8 +87,19 @@ class ImageZoomView(QGraphicsView):
         self._controller = controller
         controller.register(self)
         self._scene = QGraphicsScene(self)
+        # Un solo pixmap in scena: niente indice BSP né calcolo delle regioni sporche
+        self._scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.setScene(self._scene)
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Solo un pixmap, niente testo o forme: nessun antialiasing né salvataggio dello stato del painter
+        self.setRenderHint(QPainter.Antialiasing, False)
+        self.setRenderHint(QPainter.TextAntialiasing, False)
+        self.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        self.setOptimizationFlag(QGraphicsView.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, True)
         self._pix_item: QGraphicsPixmapItem | None = None
+        self._src_pm: QPixmap | None = None
+        self._scene_box = (0.0, 0.0, 1.0, 1.0)
         self.setFixedSize(270, 430)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -73,17 +110,26 @@ class ImageZoomView(QGraphicsView):
         self._last_pos = None
         self._drag_anchor_scene = None
         self._drag_start_center = None
-        self._last_cx = 0.5
-        self._last_cy = 0.5
+        self._wheel_accum = 0
         self._fit_scale = 1.0
+        # Durante zoom/pan si disegna con FastTransformation; a input fermo si torna allo smooth
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(150)
+        self._idle_timer.timeout.connect(self._on_interaction_idle)
 
     def set_pixmap(self, pm: QPixmap):
         self._scene.clear()
         self._pix_item = None
+        self._src_pm = None
         if pm and (not pm.isNull()):
+            self._src_pm = pm
             self._pix_item = self._scene.addPixmap(pm)
-            self._pix_item.setTransformationMode(Qt.SmoothTransformation)
+            self._pix_item.setTransformationMode(Qt.FastTransformation)
+            # Il pixmap scalato resta in cache: nel pan Qt lo copia senza ricampionarlo
+            self._pix_item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
             self._scene.setSceneRect(pm.rect())
+            self._scene_box = (0.0, 0.0, float(pm.width()), float(pm.height()))
             self._compute_fit_scale()
             self.apply_sync()
         else:
@@ -94,75 +140,63 @@ class ImageZoomView(QGraphicsView):
         if not self._pix_item:
             self._fit_scale = 1.0
             return
-        rect = self._pix_item.boundingRect()
+        rect = self._scene.sceneRect()
         if rect.width() <= 0 or rect.height() <= 0:
             self._fit_scale = 1.0
             return
         vw = self.viewport().width()
         vh = self.viewport().height()
         self._fit_scale = max(vw / rect.width(), vh / rect.height())
-        self.apply_sync()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self._compute_fit_scale()
+        self.apply_sync()
 
     def wheelEvent(self, event: QWheelEvent):
         delta = event.angleDelta().y()
         if delta == 0:
             return
-        factor = 1.25 if delta > 0 else 0.8
-        self._controller.multiply_zoom(factor)
+        # Touchpad ad alta precisione: delta di pochi gradi; si zooma solo a scatto intero (120)
+        self._wheel_accum += delta
+        steps = int(self._wheel_accum / 120)
+        if steps == 0:
+            return
+        self._wheel_accum -= steps * 120
+        self._controller.multiply_zoom(1.25 ** steps)
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.LeftButton:
             self._dragging = True
             self._last_pos = event.position().toPoint()
-            try:
-                self._drag_anchor_scene = self.mapToScene(self._last_pos)
-                self._drag_start_center = self.mapToScene(self.viewport().rect().center())
-                br = self._pix_item.boundingRect() if self._pix_item else None
-                if br and br.width() > 0 and (br.height() > 0):
-                    self._last_cx = (self._drag_start_center.x() - br.left()) / br.width()
-                    self._last_cy = (self._drag_start_center.y() - br.top()) / br.height()
-            except Exception:
-                self._drag_anchor_scene = None
-                self._drag_start_center = None
+            self._drag_anchor_scene = self.mapToScene(self._last_pos)
+            self._drag_start_center = self.mapToScene(self.viewport().rect().center())
             self.setCursor(QCursor(Qt.ClosedHandCursor))
             event.accept()
             return
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event: QMouseEvent):
-        if self._dragging and self._pix_item:
-            try:
-                curr_scene_under_mouse = self.mapToScene(event.position().toPoint())
-                if self._drag_anchor_scene is None or self._drag_start_center is None:
-                    self._drag_anchor_scene = curr_scene_under_mouse
-                    self._drag_start_center = self.mapToScene(self.viewport().rect().center())
-                delta_scene = curr_scene_under_mouse - self._drag_anchor_scene
-                min_threshold = 1.0
-                if abs(delta_scene.x()) < min_threshold and abs(delta_scene.y()) < min_threshold:
-                    return
-                new_center = self._drag_start_center - delta_scene
-                br = self._pix_item.boundingRect()
-                if br.width() > 0 and br.height() > 0:
-                    cx = (new_center.x() - br.left()) / br.width()
-                    cy = (new_center.y() - br.top()) / br.height()
-                    cx = max(0.0, min(1.0, cx))
-                    cy = max(0.0, min(1.0, cy))
-                    if hasattr(self, '_last_cx') and hasattr(self, '_last_cy'):
-                        smoothing_factor = 0.3
-                        cx = cx * (1 - smoothing_factor) + self._last_cx * smoothing_factor
-                        cy = cy * (1 - smoothing_factor) + self._last_cy * smoothing_factor
-                    self._last_cx = cx
-                    self._last_cy = cy
-                    self._controller.set_center_ratio(cx, cy)
-                event.accept()
-                return
-            except Exception:
-                pass
-        super().mouseMoveEvent(event)
+        if not self._dragging or self._pix_item is None:
+            super().mouseMoveEvent(event)
+            return
+        curr_scene_under_mouse = self.mapToScene(event.position().toPoint())
+        if self._drag_anchor_scene is None or self._drag_start_center is None:
+            self._drag_anchor_scene = curr_scene_under_mouse
+            self._drag_start_center = self.mapToScene(self.viewport().rect().center())
+        delta_scene = curr_scene_under_mouse - self._drag_anchor_scene
+        min_threshold = 1.0
+        if abs(delta_scene.x()) < min_threshold and abs(delta_scene.y()) < min_threshold:
+            return
+        new_center = self._drag_start_center - delta_scene
+        # Rettangolo della scena noto da set_pixmap: niente eccezioni da intercettare a ogni movimento
+        left, top, br_w, br_h = self._scene_box
+        if br_w > 0 and br_h > 0:
+            cx = max(0.0, min(1.0, (new_center.x() - left) / br_w))
+            cy = max(0.0, min(1.0, (new_center.y() - top) / br_h))
+            # Nessuno smoothing: il controller tiene solo l'ultima posizione per frame
+            self._controller.set_center_ratio(cx, cy)
+        event.accept()
 
     def mouseReleaseEvent(self, event: QMouseEvent):
         if event.button() == Qt.LeftButton and self._dragging:
@@ -178,41 +212,91 @@ class ImageZoomView(QGraphicsView):
         if not self._pix_item:
             return
         scale = self._fit_scale * self._controller.zoom_rel
+        self._use_scaled_pixmap(scale)
+        if self._pix_item.transformationMode() != Qt.FastTransformation:
+            self._pix_item.setTransformationMode(Qt.FastTransformation)
+            self.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        self._idle_timer.start()
         tr = QTransform()
         tr.scale(scale, scale)
         self.setTransform(tr)
-        br = self._pix_item.boundingRect()
-        cx = br.left() + self._controller.cx * br.width()
-        cy = br.top() + self._controller.cy * br.height()
-        target = QPointF(cx, cy)
-        vis = self.mapToScene(self.viewport().rect()).boundingRect()
-        half_w = vis.width() / 2.0
-        half_h = vis.height() / 2.0
-        min_x = br.left() + half_w
-        max_x = br.right() - half_w
-        min_y = br.top() + half_h
-        max_y = br.bottom() - half_h
-        if br.width() <= vis.width():
-            target.setX(br.center().x())
+        # Area visibile ricavata dalla scala nota, senza invertire la trasformazione (mapToScene)
+        left, top, br_w, br_h = self._scene_box
+        vis_w = self.viewport().width() / scale
+        vis_h = self.viewport().height() / scale
+        if br_w <= vis_w:
+            x = left + br_w / 2.0
+        else:
+            x = max(left + vis_w / 2.0, min(left + br_w - vis_w / 2.0, left + self._controller.cx * br_w))
+        if br_h <= vis_h:
+            y = top + br_h / 2.0
         else:
-            target.setX(max(min_x, min(max_x, target.x())))
-        if br.height() <= vis.height():
-            target.setY(br.center().y())
+            y = max(top + vis_h / 2.0, min(top + br_h - vis_h / 2.0, top + self._controller.cy * br_h))
+        self.centerOn(QPointF(x, y))
+
+    def _on_interaction_idle(self):
+        if self._pix_item:
+            self._pix_item.setTransformationMode(Qt.SmoothTransformation)
+            self.setRenderHint(QPainter.SmoothPixmapTransform, True)
+            self.viewport().update()
+
+    def _use_scaled_pixmap(self, scale: float):
+        # Sotto 1:1 l'originale si riduce una sola volta per livello di zoom (in QPixmapCache):
+        # la vista disegna poi un pixmap quasi 1:1 invece di ricampionare l'intera pagina.
+        # L'item viene riscalato in modo da occupare sempre il rettangolo della scena originale
+        src = self._src_pm
+        bucket = max(1, round(scale * 100))
+        if bucket >= 100:
+            pm = src
         else:
-            target.setY(max(min_y, min(max_y, target.y())))
-        self.centerOn(target)
+            key = f'{src.cacheKey()}:{bucket}'
+            pm = QPixmap()
+            if not QPixmapCache.find(key, pm):
+                pm = self._downscale(src, bucket / 100.0)
+                QPixmapCache.insert(key, pm)
+        if pm.cacheKey() != self._pix_item.pixmap().cacheKey():
+            self._pix_item.setPixmap(pm)
+            self._pix_item.setScale(src.width() / pm.width())
+
+    @staticmethod
+    def _downscale(src: QPixmap, ratio: float) -> QPixmap:
+        # Due passaggi: riduzione veloce fino al doppio della destinazione, poi smooth solo sull'ultimo 2x
+        w = max(1, round(src.width() * ratio))
+        h = max(1, round(src.height() * ratio))
+        if src.width() > 2 * w and src.height() > 2 * h:
+            src = src.scaled(2 * w, 2 * h, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        return src.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+class PreviewLoaderSignals(QObject):
+    loaded = Signal(int, int, str, QImage)
+
+class PreviewLoader(QRunnable):
+    # Decodifica PNG fuori dal thread GUI; QImage è sicura tra thread, il QPixmap
+    # va creato nel thread GUI quando arriva il segnale
+
+    def __init__(self, path: Path, slot: int, generation: int, signals: PreviewLoaderSignals):
+        super().__init__()
+        self.path = path
+        self.slot = slot
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        image = QImage(str(self.path)) if self.path and self.path.exists() else QImage()
+        self.signals.loaded.emit(self.generation, self.slot, str(self.path or ''), image)
 
 class Signals(QObject):
     log = Signal(str)
-    progress = Signal(int, int, float)
     file_done = Signal(str, str)
     error = Signal(str)
     all_done = Signal()
 
-class CompressorWorker(Thread):
+class CompressorWorker(QRunnable):
 
     def __init__(self, files, out_dir: Path, tmp_dir: Path, device: str, mode: str, quality: int, max_colors: int, workers: Optional[int], ram_limit: int, signals: Signals, preset_key: Optional[str]=None):
-        super().__init__(daemon=True)
+        super().__init__()
+        # Il riferimento resta alla GUI (request_stop): non lasciare che il pool distrugga l'oggetto
+        self.setAutoDelete(False)
         self.files = files
         self.out_dir = out_dir
         self.tmp_dir = tmp_dir
@@ -224,15 +308,19 @@ class CompressorWorker(Thread):
         self.ram_limit = ram_limit
         self.signals = signals
         self.preset_key = preset_key
-        from threading import Event
         self._stop_event = Event()
         self.compressor = None
+        # Ultimo avanzamento non ancora letto dalla GUI: gli eventi intermedi si sovrascrivono
+        self._pending_progress = None
+        self._progress_lock = Lock()
 
     def progress_cb(self, payload: dict):
         try:
             evt = payload.get('event')
             if evt == 'progress':
-                self.signals.progress.emit(int(payload.get('pages_processed', 0)), int(payload.get('pages_total', 0)), float(payload.get('percent', 0.0)))
+                progress = (int(payload.get('pages_processed', 0)), int(payload.get('pages_total', 0)), float(payload.get('percent', 0.0)))
+                with self._progress_lock:
+                    self._pending_progress = progress
             elif evt == 'file_done':
                 self.signals.file_done.emit(payload.get('file', ''), payload.get('output', ''))
             elif evt == 'error':
@@ -240,6 +328,11 @@ class CompressorWorker(Thread):
         except Exception:
             pass
 
+    def take_progress(self):
+        with self._progress_lock:
+            progress, self._pending_progress = self._pending_progress, None
+        return progress
+
     def run(self):
         try:
             self.compressor = MangaCompressorModular(target_device=self.device, quality=self.quality, max_colors=self.max_colors, compression_mode=self.mode, workers=self.workers, ram_limit_percent=self.ram_limit, tmp_dir=str(self.tmp_dir), progress_callback=self.progress_cb, stop_checker=lambda: self._stop_event.is_set())
@@ -264,6 +357,9 @@ class CompressorWorker(Thread):
         except Exception as e:
             self.signals.error.emit(str(e))
             self.signals.all_done.emit()
+        finally:
+            if self.compressor:
+                self.compressor.close()
 
     def request_stop(self):
         try:
@@ -274,6 +370,10 @@ class CompressorWorker(Thread):
             pass
 
 class MangaCompressorGUI(QWidget):
+    # Rapporto stimato dimensione output/input per preset (stime e suggerimenti)
+    _PRESET_SIZE_RATIOS = {'ultra': 0.82, 'very_high': 0.72, 'high': 0.65, 'normal': 0.5, 'low': 0.38, 'very_low': 0.33, 'minimal': 0.28}
+    # Prefissi dei messaggi del worker (in inglese) tradotti nel log
+    _LOG_TRANSLATIONS = {'it': (('Processing:', 'Elaborazione:'), ('Done:', 'Fatto:'), ('Error:', 'Errore:'), ('Skipping invalid file:', 'Salto file non valido:'), ('Completed with', 'Completato con'))}
 
     def __init__(self):
         super().__init__()
@@ -284,7 +384,6 @@ class MangaCompressorGUI(QWidget):
         self.presets = self._load_presets()
         self.signals = Signals()
         self.signals.log.connect(self.on_log)
-        self.signals.progress.connect(self.on_progress)
         self.signals.file_done.connect(self.on_file_done)
         self.signals.error.connect(self.on_error)
         self.signals.all_done.connect(self.on_all_done)
@@ -307,18 +406,38 @@ class MangaCompressorGUI(QWidget):
             }
         self._stop_requested = False
         self.theme = self.defaults.get('theme', 'dark')
+        self._applied_theme = None
         self.language = self.defaults.get('language', 'en')
         self.ui_mode = self.defaults.get('ui_mode', 'simple')
+        # Raffiche di messaggi di log: accodati e aggiunti alla lista in blocco ogni 50 ms
+        self._pending_log = deque()
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(50)
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        # Icone SVG già rasterizzate, per (nome, dimensione, colore, tema)
+        self._icon_cache: dict[tuple, QIcon] = {}
+        self._svg_renderers: dict[str, Optional[QSvgRenderer]] = {}
         self._save_timer = QTimer(self)
         self._save_timer.setSingleShot(True)
         self._save_timer.timeout.connect(self._persist_defaults_now)
         # Load i18n dictionaries from external JSON files (i18n/*.json)
         self._load_i18n()
+        # Dizionario della lingua corrente, aggiornato da apply_language
+        self._t = self.i18n.get(self.language, {})
+        self._log_translations = self._LOG_TRANSLATIONS.get(self.language, ())
         self._build_ui()
         self._load_defaults_into_ui()
         self.apply_theme(self.theme)
         self.apply_language(self.language)
         self.worker = None  # type: ignore
+        # Un solo job di compressione alla volta, separato dal pool globale (anteprime, salvataggi)
+        self._worker_pool = QThreadPool(self)
+        self._worker_pool.setMaxThreadCount(1)
+        # L'avanzamento del worker si legge una volta per frame (~30 Hz) invece di un segnale per evento
+        self._progress_poll_timer = QTimer(self)
+        self._progress_poll_timer.setInterval(33)
+        self._progress_poll_timer.timeout.connect(self._poll_worker_progress)
         # progress animation controller (per-segment)
         self._progress_timer = QTimer(self)
         self._progress_timer.setInterval(50)
@@ -380,11 +499,11 @@ class MangaCompressorGUI(QWidget):
         add_btn.setIcon(self._icon('file-plus'))
         rem_btn = QPushButton()
         rem_btn.setObjectName('removeButton')
-        rem_btn.setIcon(self._icon('trash'))
+        rem_btn.setIcon(self._icon('trash', color_override=Qt.white))
         rem_btn.setEnabled(False)
         clear_btn = QPushButton()
         clear_btn.setObjectName('clearButton')
-        clear_btn.setIcon(self._icon('trash'))
+        clear_btn.setIcon(self._icon('trash', color_override=Qt.white))
         add_btn.clicked.connect(self.on_add_files)
         rem_btn.clicked.connect(self.on_remove_selected)
         # clear deve anche aggiornare lo stato dei pulsanti e di "Avvia"
@@ -453,7 +572,7 @@ class MangaCompressorGUI(QWidget):
         out_row.addWidget(self.out_dir_edit, 1)
         self.out_btn = QPushButton()
         self.out_btn.setObjectName('outButton')
-        self.out_btn.clicked.connect(lambda: self.choose_dir(self.out_dir_edit))
+        self.out_btn.clicked.connect(self._choose_out_dir)
         self.out_btn.setIcon(self._icon('folder-open'))
         out_row.addWidget(self.out_btn)
         layout.addLayout(out_row)
@@ -656,74 +775,9 @@ class MangaCompressorGUI(QWidget):
         self.create_custom_btn.setCheckable(True)  # Permette di mantenere lo stato premuto
         opts_grid.addWidget(self.create_custom_btn, 1, 0, 1, 2)
 
-        # Campi custom (nascosti di default), immediatamente sotto Brand/Model, su due righe
-        # Labels per chiarire i campi
-        self.custom_name_label = QLabel('Name:')
-        self.custom_name_edit = QLineEdit()
-        self.custom_name_edit.setPlaceholderText('Custom')
-        self.custom_inches_label = QLabel('Diagonal (in):')
-        self.custom_inches = QDoubleSpinBox()
-        self.custom_inches.setRange(4.0, 30.0)
-        self.custom_inches.setSingleStep(0.1)
-        self.custom_inches.setDecimals(1)
-        self.custom_inches.setValue(10.0)
-        self.custom_w_label = QLabel('Width (px):')
-        self.custom_w_spin = QSpinBox()
-        self.custom_w_spin.setRange(600, 6000)
-        self.custom_w_spin.setValue(1600)
-        self.custom_h_label = QLabel('Height (px):')
-        self.custom_h_spin = QSpinBox()
-        self.custom_h_spin.setRange(600, 6000)
-        self.custom_h_spin.setValue(2560)
-        self.custom_dpi_label = QLabel('DPI:')
-        self.custom_dpi_spin = QSpinBox()
-        self.custom_dpi_spin.setRange(96, 600)
-        self.custom_dpi_spin.setValue(300)
-        # Tooltips
-        self.custom_name_edit.setToolTip('Nome modello personalizzato')
-        self.custom_inches.setToolTip('Diagonale in pollici (in)')
-        self.custom_w_spin.setToolTip('Larghezza in pixel')
-        self.custom_h_spin.setToolTip('Altezza in pixel')
-        self.custom_dpi_spin.setToolTip('Densità (dots per inch)')
-
-        # Pulsante salvataggio custom (icona migliorata)
-        self.save_custom_btn = QPushButton(' Save device')
-        self.save_custom_btn.setIcon(self._icon('sliders'))  # Icona più appropriata per device settings
-        self.save_custom_btn.setToolTip('Salva questo dispositivo sotto il brand "Customs"')
-        self.save_custom_btn.clicked.connect(self._on_save_custom_device)
-
-        # Container riga 1 (nascosto di default)
-        self.cust_container1 = QWidget()
-        cust_row1 = QHBoxLayout(self.cust_container1)
-        cust_row1.setSpacing(8)
-        # Prima riga: Name, Diagonal (in), DPI(PPI) - centrati
-        cust_row1.addStretch(1)
-        cust_row1.addWidget(self.custom_name_label)
-        cust_row1.addWidget(self.custom_name_edit)
-        cust_row1.addWidget(self.custom_inches_label)
-        cust_row1.addWidget(self.custom_inches)
-        cust_row1.addWidget(self.custom_dpi_label)
-        cust_row1.addWidget(self.custom_dpi_spin)
-        cust_row1.addStretch(1)
-        self.cust_container1.setVisible(False)
-
-        # Container riga 2 (nascosto di default)
-        self.cust_container2 = QWidget()
-        cust_row2 = QHBoxLayout(self.cust_container2)
-        cust_row2.setSpacing(8)
-        # Seconda riga: Width (px), Height (px), Save device - centrati
-        cust_row2.addStretch(1)
-        cust_row2.addWidget(self.custom_w_label)
-        cust_row2.addWidget(self.custom_w_spin)
-        cust_row2.addWidget(self.custom_h_label)
-        cust_row2.addWidget(self.custom_h_spin)
-        cust_row2.addWidget(self.save_custom_btn)
-        cust_row2.addStretch(1)
-        self.cust_container2.setVisible(False)
-
-        # Posiziona i container nascosti in griglia (righe 2 e 3)
-        opts_grid.addWidget(self.cust_container1, 2, 0, 1, 2)
-        opts_grid.addWidget(self.cust_container2, 3, 0, 1, 2)
+        # I campi del dispositivo personalizzato (righe 2 e 3 della griglia) si costruiscono
+        # solo alla prima apertura da "Create a custom device": nessuno stile/layout da calcolare all'avvio
+        self._opts_grid = opts_grid
 
         # Riga Modalità: usa un layout orizzontale per avvicinare label e select (spostata più in basso)
         h_mode = QHBoxLayout()
@@ -781,7 +835,7 @@ class MangaCompressorGUI(QWidget):
         btn_row2 = QHBoxLayout()
         self.start_btn = QPushButton()
         self.start_btn.setObjectName('startButton')
-        self.start_btn.setIcon(self._icon('play'))
+        self.start_btn.setIcon(self._icon('play', color_override=Qt.white))
         self.start_btn.clicked.connect(self.on_start)
         try:
             # evitiamo casi in cui il bottone risulti visivamente attivo ma non riceva click (overlay/stacking)
@@ -799,7 +853,7 @@ class MangaCompressorGUI(QWidget):
         btn_row2.addWidget(self.stop_btn)
         self.open_output_btn = QPushButton()
         self.open_output_btn.setObjectName('openOutputButton')
-        self.open_output_btn.setIcon(self._icon('folder-open'))
+        self.open_output_btn.setIcon(self._icon('folder-open', color_override=Qt.white))
         self.open_output_btn.clicked.connect(self.on_open_output)
         btn_row2.addWidget(self.open_output_btn)
         btn_row2.addStretch(1)
@@ -836,6 +890,8 @@ class MangaCompressorGUI(QWidget):
             self.out_dir_edit.textChanged.connect(self._validate_dirs_enable_start)
         except Exception:
             pass
+        # Pulsanti con objectName, risolti una volta invece di un findChild (visita dell'albero) per uso
+        self._named_buttons = {b.objectName(): b for b in self.findChildren(QPushButton) if b.objectName()}
         # stato iniziale dei bottoni
         self._update_files_buttons_state()
         self._validate_dirs_enable_start()
@@ -991,32 +1047,60 @@ class MangaCompressorGUI(QWidget):
         pv.addWidget(self.preview_level_label)
         pv.addStretch(1)
         root_layout.addWidget(self.preview_panel, 0)
+        self._preview_signals = PreviewLoaderSignals()
+        self._preview_signals.loaded.connect(self._on_preview_loaded)
+        self._preview_generation = 0
+        self._preview_orig_requested = False
+        # Raffiche di cambi preset (clic, frecce): un solo aggiornamento anteprime dopo 30 ms
+        self._pending_preset_key = 'normal'
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(30)
+        self._preview_timer.timeout.connect(self._do_update_previews)
         self._preview_compressed_map = {'minimal': '1_image_compressed_minimal.png', 'very_low': '2_image_compressed_very_low.png', 'low': '3_image_compressed_low.png', 'normal': '4_image_compressed_normal.png', 'high': '5_image_compressed_high.png', 'very_high': '6_image_compressed_very_high.png', 'ultra': '7_image_compressed_ultra.png'}
 
     def _update_previews(self, preset_key: str):
+        self._pending_preset_key = preset_key
+        self._preview_timer.start()
+
+    def _do_update_previews(self):
+        preset_key = self._pending_preset_key
         try:
             base = Path(__file__).parent / 'assets' / 'previews'
-            orig_path = base / 'image.png'
-            pm_orig = QPixmap(str(orig_path)) if orig_path.exists() else QPixmap()
-            try:
-                self.preview_view1.set_pixmap(pm_orig if not pm_orig.isNull() else QPixmap())
-            except Exception:
-                pass
             comp_name = self._preview_compressed_map.get(preset_key)
-            comp_pm = QPixmap()
-            if comp_name:
-                comp_path = base / comp_name
-                if comp_path.exists():
-                    comp_pm = QPixmap(str(comp_path))
-            try:
-                self.preview_view2.set_pixmap(comp_pm if not comp_pm.isNull() else QPixmap())
-            except Exception:
-                pass
+            # Clic ravvicinati sui preset: vale solo il caricamento più recente
+            self._preview_generation += 1
+            pool = QThreadPool.globalInstance()
+            # L'originale non cambia col preset: caricato una volta, il suo pixmap (e i livelli di
+            # zoom già ridotti in QPixmapCache sotto il suo cacheKey) resta valido tra un clic e l'altro
+            if not self._preview_orig_requested:
+                self._preview_orig_requested = True
+                pool.start(PreviewLoader(base / 'image.png', 0, self._preview_generation, self._preview_signals))
+            comp_path = base / comp_name if comp_name else None
+            # Anteprima già decodificata in un clic precedente: niente I/O né decodifica PNG
+            cached = QPixmap()
+            if comp_path and QPixmapCache.find(str(comp_path), cached):
+                self.preview_view2.set_pixmap(cached)
+            else:
+                pool.start(PreviewLoader(comp_path, 1, self._preview_generation, self._preview_signals))
             # Non mostrare più il testo del livello
             self.preview_level_label.setText('')
         except Exception:
             pass
 
+    @Slot(int, int, str, QImage)
+    def _on_preview_loaded(self, generation: int, slot: int, path: str, image: QImage):
+        pm = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        if path and not pm.isNull():
+            QPixmapCache.insert(path, pm)
+        if slot == 1 and generation != self._preview_generation:
+            return
+        view = self.preview_view1 if slot == 0 else self.preview_view2
+        try:
+            view.set_pixmap(pm)
+        except Exception:
+            pass
+
     def _load_defaults_into_ui(self):
         d = self.defaults
         out_dir = d.get('out_dir')
@@ -1132,13 +1216,18 @@ class MangaCompressorGUI(QWidget):
             if key and brand:
                 # sync hidden legacy combo
                 self._set_combo_by_data(self.device_combo, key)
+                # I custom salvati non sono in DEVICE_PROFILES: servono i campi compilati
+                # perché _ensure_custom_device possa ricostruire il profilo
+                is_customs = str(brand).lower() == 'customs'
+                if is_customs and not hasattr(self, 'cust_container1'):
+                    self._build_custom_device_fields()
                 # update custom fields from chosen model
                 for m in self._devices_map.get(brand, []):
                     if m.get('key') == key:
                         self._prefill_custom_from_model(m)
                         break
                 # If selecting a model under 'Customs', automatically enable custom usage
-                if str(brand).lower() == 'customs' and hasattr(self, 'use_custom_chk'):
+                if is_customs and hasattr(self, 'use_custom_chk'):
                     try:
                         self.use_custom_chk.setChecked(True)
                     except Exception:
@@ -1147,6 +1236,9 @@ class MangaCompressorGUI(QWidget):
             pass
 
     def _prefill_custom_from_model(self, m: dict):
+        # Campi non ancora costruiti: verranno precompilati quando si aprono
+        if not hasattr(self, 'custom_name_edit'):
+            return
         try:
             name = m.get('model', 'Custom')
             if isinstance(name, str) and name:
@@ -1238,17 +1330,20 @@ class MangaCompressorGUI(QWidget):
             self.on_log(f'Error: cannot save custom device: {e}')
 
     def _set_combo_by_data(self, combo: QComboBox, data: str):
-        for i in range(combo.count()):
-            if combo.itemData(i) == data:
-                combo.setCurrentIndex(i)
-                return
+        # findData cerca nel modello lato C++, senza un itemData() Python per ogni voce
+        idx = combo.findData(data)
+        if idx >= 0:
+            combo.setCurrentIndex(idx)
 
     def _icon(self, name: str, size: int=20, color_override=None) -> QIcon:
+        key = (name, size, color_override, self.theme)
+        icon = self._icon_cache.get(key)
+        if icon is not None:
+            return icon
         try:
-            svg_path = Path(__file__).parent / f'assets/icons/{name}.svg'
-            if not svg_path.exists():
+            renderer = self._svg_renderer(name)
+            if renderer is None:
                 return QIcon()
-            renderer = QSvgRenderer(str(svg_path))
             w = h = size
             pm = QPixmap(w, h)
             pm.fill(Qt.transparent)
@@ -1259,10 +1354,18 @@ class MangaCompressorGUI(QWidget):
             p.fillRect(pm.rect(), color)
             p.end()
             icon = QIcon(pm)
+            self._icon_cache[key] = icon
             return icon
         except Exception:
             return QIcon()
 
+    def _svg_renderer(self, name: str) -> Optional[QSvgRenderer]:
+        # Un solo parse XML per icona: dimensioni, colori e temi diversi riusano lo stesso renderer
+        if name not in self._svg_renderers:
+            svg_path = Path(__file__).parent / f'assets/icons/{name}.svg'
+            self._svg_renderers[name] = QSvgRenderer(str(svg_path), self) if svg_path.exists() else None
+        return self._svg_renderers[name]
+
     def _schedule_save(self):
         self._save_timer.start(2000)
 
@@ -1270,15 +1373,25 @@ class MangaCompressorGUI(QWidget):
         self.defaults['theme'] = self.theme
         self.defaults['language'] = self.language
         self.defaults['ui_mode'] = self.ui_mode
+        # Serializzazione e scrittura su disco nel thread pool, su una copia dei valori correnti
+        snapshot = dict(self.defaults)
+        QThreadPool.globalInstance().start(lambda: self._write_defaults(snapshot))
+
+    @staticmethod
+    def _write_defaults(values: dict):
         try:
-            args = type('Args', (), self.defaults)
+            args = type('Args', (), values)
             save_default_config(args)
         except Exception:
             pass
 
     def apply_theme(self, theme: str):
+        # setStyleSheet ripolisce l'intero albero dei widget: nulla da fare se il tema è già applicato
+        if theme == self._applied_theme:
+            return
+        self._applied_theme = theme
         if theme == 'light':
-            sheet = '\n            QWidget { background: #f7f7f7; color: #1f2937; }\n            QLineEdit, QListWidget { background: #ffffff; border: 1px solid #d1d5db; padding: 6px; }\n            /* Imposta esplicitamente colori delle righe per evitare righe nere */\n            QListWidget { alternate-background-color: #f9fafb; }\n            QListWidget::item { background: #ffffff; color: #111827; }\n            QListWidget::item:alternate { background: #f9fafb; }\n            /* Evidenziazione lista file (light) */\n            QListWidget::item:hover { background: #f3f4f6; }\n            QListWidget::item:selected { background: #dbeafe; color: #111827; }\n            QListWidget::item:selected:!active { background: #e5effe; color: #1f2937; }\n            QComboBox, QSpinBox, QSlider { background: #ffffff; border: 1px solid #d1d5db; padding: 3px; }\n            QPushButton { background: #e5e7eb; border: 1px solid #cbd5e1; padding: 6px 10px; border-radius: 6px; }\n            QPushButton:hover { background: #dfe3ea; }\n            QPushButton:disabled { background: #e5e7eb; color: #9ca3af; }\n            QProgressBar { background: #ffffff; border: 1px solid #d1d5db; border-radius: 6px; text-align: center; }\n            QProgressBar::chunk { background: #3b82f6; }\n            QLabel { color: #111827; }\n            /* Checkbox visibile su tema chiaro */\n            QCheckBox::indicator { width: 16px; height: 16px; border: 1px solid #6b7280; background: #ffffff; border-radius: 3px; }\n            QCheckBox::indicator:checked { background: #2563eb; border: 1px solid #1d4ed8; }\n            /* Preset attivo */\n            QPushButton[preset="true"]:checked { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            QPushButton[preset="true"]:hover { background: #3b82f6; color: white; }\n            QPushButton[preset="true"]:checked:hover { background: #1d4ed8; color: white; }\n\n            /* Bottoni colorati */\n            #startButton { background: #16a34a; color: white; border: 1px solid #15803d; }\n            #startButton:hover { background: #22c55e; }\n            #stopButton { background: #dc2626; color: white; border: 1px solid #b91c1c; }\n            #stopButton:hover { background: #ef4444; }\n            #stopButton:disabled { background: #e5e7eb; color: #9ca3af; border: 1px solid #cbd5e1; }\n            #openOutputButton { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            #openOutputButton:hover { background: #3b82f6; }\n            #removeButton, #clearButton { background: #b45309; color: white; border: 1px solid #92400e; }\n            #removeButton:hover, #clearButton:hover { background: #d97706; }\n            #removeButton:disabled, #clearButton:disabled { background: #e5e7eb; color: #9ca3af; border: 1px solid #cbd5e1; }\n\n            /* pulsanti spinbox standard */\n            QSpinBox::up-button { subcontrol-origin: border; subcontrol-position: top right; }\n            QSpinBox::down-button { subcontrol-origin: border; subcontrol-position: bottom right; }\n            '
+            sheet = _STYLE_LIGHT
             self.theme_btn.setIcon(self._icon('sun'))
             try:
                 self.preview_view1.setStyleSheet('QGraphicsView { border: 1px solid #d1d5db; background: #ffffff; }')
@@ -1286,7 +1399,7 @@ class MangaCompressorGUI(QWidget):
             except Exception:
                 pass
         else:
-            sheet = '\n            QWidget { background: #0f1419; color: #eef2f5; }\n            QLineEdit, QListWidget { background: #1b2229; border: 1px solid #2b3540; padding: 6px; }\n            /* Evidenziazione lista file (dark) */\n            QListWidget::item:hover { background: #25303a; }\n            QListWidget::item:selected { background: #1e3a8a; color: #ffffff; }\n            QListWidget::item:selected:!active { background: #1f2a44; color: #ffffff; }\n            QComboBox, QSpinBox, QSlider { background: #1b2229; border: 1px solid #2b3540; padding: 3px; }\n            QPushButton { background: #2b3540; border: 1px solid #3a4653; padding: 6px 10px; border-radius: 6px; }\n            QPushButton:hover { background: #354252; }\n            QPushButton:disabled { background: #20262d; color: #8b98a5; }\n            QProgressBar { background: #1b2229; border: 1px solid #2b3540; border-radius: 6px; text-align: center; }\n            QProgressBar::chunk { background: #00bcd4; }\n            QLabel { color: #c9d1d9; }\n            /* Preset attivo */\n            QPushButton[preset="true"]:checked { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            QPushButton[preset="true"]:checked:hover { background: #3b82f6; color: white; }\n\n            /* Bottoni colorati */\n            #startButton { background: #16a34a; color: white; border: 1px solid #15803d; }\n            #startButton:hover { background: #22c55e; }\n            #stopButton { background: #b91c1c; color: white; border: 1px solid #991b1b; }\n            #stopButton:hover { background: #dc2626; }\n            #stopButton:disabled { background: #20262d; color: #8b98a5; border: 1px solid #3a4653; }\n            #openOutputButton { background: #2563eb; color: white; border: 1px solid #1d4ed8; }\n            #openOutputButton:hover { background: #3b82f6; }\n            #removeButton, #clearButton { background: #b45309; color: white; border: 1px solid #92400e; }\n            #removeButton:hover, #clearButton:hover { background: #d97706; }\n            #removeButton:disabled, #clearButton:disabled { background: #20262d; color: #8b98a5; border: 1px solid #3a4653; }\n\n            /* pulsanti spinbox standard */\n            QSpinBox::up-button { subcontrol-origin: border; subcontrol-position: top right; }\n            QSpinBox::down-button { subcontrol-origin: border; subcontrol-position: bottom right; }\n            '
+            sheet = _STYLE_DARK
             self.theme_btn.setIcon(self._icon('moon'))
             try:
                 self.preview_view1.setStyleSheet('QGraphicsView { border: 1px solid #2b3540; background: #0f1419; }')
@@ -1296,7 +1409,7 @@ class MangaCompressorGUI(QWidget):
         self.setStyleSheet(sheet)
         self.theme = theme
         try:
-            t = self.i18n[self.language]
+            t = self._t
             if hasattr(self, 'theme_btn'):
                 # Mostra l'azione: clic su "Dark" imposta tema scuro, e viceversa
                 self.theme_btn.setText(t['dark'] if theme == 'light' else t['light'])
@@ -1304,36 +1417,21 @@ class MangaCompressorGUI(QWidget):
                 self.mode_btn.setIcon(self._icon('advanced' if self.ui_mode == 'advanced' else 'simple'))
         except Exception:
             pass
-        for btn_name in ('addButton', 'removeButton', 'clearButton', 'outButton', 'startButton', 'openOutputButton', 'themeButton', 'uiModeButton', 'clearLogButton'):
-            b = self.findChild(QPushButton, btn_name)
-            if not b:
-                continue
-            icon_map = {'addButton': 'file-plus', 'removeButton': 'trash', 'clearButton': 'trash', 'outButton': 'folder-open', 'startButton': 'play', 'openOutputButton': 'folder-open', 'themeButton': 'sun' if theme == 'light' else 'moon', 'uiModeButton': 'advanced' if self.ui_mode == 'advanced' else 'simple', 'clearLogButton': 'trash'}
-            b.setIcon(self._icon(icon_map.get(btn_name, 'folder-open')))
-        try:
-            rb = self.findChild(QPushButton, 'removeButton')
-            if rb:
-                rb.setIcon(self._icon('trash', color_override=Qt.white))
-            cb = self.findChild(QPushButton, 'clearButton')
-            if cb:
-                cb.setIcon(self._icon('trash', color_override=Qt.white))
-            sb = self.findChild(QPushButton, 'startButton')
-            if sb:
-                sb.setIcon(self._icon('play', color_override=Qt.white))
-            ob = self.findChild(QPushButton, 'openOutputButton')
-            if ob:
-                ob.setIcon(self._icon('folder-open', color_override=Qt.white))
-        except Exception:
-            pass
+        # Solo le icone che seguono il tema; i pulsanti colorati (rimuovi, svuota, avvia, apri output)
+        # hanno l'icona bianca in entrambi i temi, assegnata una volta in _build_ui
+        theme_icons = {'addButton': 'file-plus', 'outButton': 'folder-open', 'themeButton': 'sun' if theme == 'light' else 'moon', 'uiModeButton': 'advanced' if self.ui_mode == 'advanced' else 'simple', 'clearLogButton': 'trash'}
+        for btn_name, icon_name in theme_icons.items():
+            b = self._named_buttons.get(btn_name)
+            if b:
+                b.setIcon(self._icon(icon_name))
         self._schedule_save()
 
     def apply_language(self, lang: str):
         # accept any available language loaded from i18n folder
         self.language = lang if lang in self.i18n else (self.language if self.language in self.i18n else (list(self.i18n.keys())[0] if self.i18n else 'en'))
-        t = self.i18n[self.language]
+        t = self._t = self.i18n[self.language]
+        self._log_translations = self._LOG_TRANSLATIONS.get(self.language, ())
         self.setWindowTitle(t['window_title'])
-        for btn in self.findChildren(QPushButton):
-            pass
         # Preview titles and labels
         if hasattr(self, 'preview_title'):
             self.preview_title.setText(t.get('preview_title', self.preview_title.text()))
@@ -1344,13 +1442,13 @@ class MangaCompressorGUI(QWidget):
         if hasattr(self, 'preview_label2'):
             self.preview_label2.setText(t.get('preview_compressed', self.preview_label2.text()))
         self.files_list.setToolTip(t['drag_hint'])
-        add_btn = self.findChild(QPushButton, 'addButton')
+        add_btn = self._named_buttons.get('addButton')
         if add_btn:
             add_btn.setText(t['add'])
-        rem_btn = self.findChild(QPushButton, 'removeButton')
+        rem_btn = self._named_buttons.get('removeButton')
         if rem_btn:
             rem_btn.setText(t['remove'])
-        clear_btn = self.findChild(QPushButton, 'clearButton')
+        clear_btn = self._named_buttons.get('clearButton')
         if clear_btn:
             clear_btn.setText(t['clear'])
         self.lbl_out.setText(t['output_dir'])
@@ -1427,12 +1525,16 @@ class MangaCompressorGUI(QWidget):
         try:
             cur_key = self.mode_combo.currentData()
             self.mode_combo.blockSignals(True)
+            # Un solo giro: si annota l'indice della voce corrente mentre si riscrivono i testi
+            target = -1
             for i in range(self.mode_combo.count()):
                 key = self.mode_combo.itemData(i)
                 self.mode_combo.setItemText(i, f"{key} — {self._localized_mode_label(key)}")
+                if cur_key is not None and key == cur_key:
+                    target = i
             # restore selection
-            if cur_key is not None:
-                self._set_combo_by_data(self.mode_combo, cur_key)
+            if target >= 0:
+                self.mode_combo.setCurrentIndex(target)
         except Exception:
             pass
         finally:
@@ -1443,7 +1545,7 @@ class MangaCompressorGUI(QWidget):
 
     def _localized_mode_label(self, key: str) -> str:
         try:
-            t = self.i18n.get(self.language, {})
+            t = self._t
             modes = t.get('modes', {}) if isinstance(t, dict) else {}
             return modes.get(key, COMPRESSION_MODES.get(key, key))
         except Exception:
@@ -1515,8 +1617,80 @@ class MangaCompressorGUI(QWidget):
 
         return SliderDragHandler(slider)
 
+    def _build_custom_device_fields(self):
+        # Campi custom (nascosti di default), immediatamente sotto Brand/Model, su due righe
+        # Labels per chiarire i campi
+        self.custom_name_label = QLabel('Name:')
+        self.custom_name_edit = QLineEdit()
+        self.custom_name_edit.setPlaceholderText('Custom')
+        self.custom_inches_label = QLabel('Diagonal (in):')
+        self.custom_inches = QDoubleSpinBox()
+        self.custom_inches.setRange(4.0, 30.0)
+        self.custom_inches.setSingleStep(0.1)
+        self.custom_inches.setDecimals(1)
+        self.custom_inches.setValue(10.0)
+        self.custom_w_label = QLabel('Width (px):')
+        self.custom_w_spin = QSpinBox()
+        self.custom_w_spin.setRange(600, 6000)
+        self.custom_w_spin.setValue(1600)
+        self.custom_h_label = QLabel('Height (px):')
+        self.custom_h_spin = QSpinBox()
+        self.custom_h_spin.setRange(600, 6000)
+        self.custom_h_spin.setValue(2560)
+        self.custom_dpi_label = QLabel('DPI:')
+        self.custom_dpi_spin = QSpinBox()
+        self.custom_dpi_spin.setRange(96, 600)
+        self.custom_dpi_spin.setValue(300)
+        # Tooltips
+        self.custom_name_edit.setToolTip('Nome modello personalizzato')
+        self.custom_inches.setToolTip('Diagonale in pollici (in)')
+        self.custom_w_spin.setToolTip('Larghezza in pixel')
+        self.custom_h_spin.setToolTip('Altezza in pixel')
+        self.custom_dpi_spin.setToolTip('Densità (dots per inch)')
+
+        # Pulsante salvataggio custom (icona migliorata)
+        self.save_custom_btn = QPushButton(' Save device')
+        self.save_custom_btn.setIcon(self._icon('sliders'))  # Icona più appropriata per device settings
+        self.save_custom_btn.setToolTip('Salva questo dispositivo sotto il brand "Customs"')
+        self.save_custom_btn.clicked.connect(self._on_save_custom_device)
+
+        # Container riga 1 (nascosto di default)
+        self.cust_container1 = QWidget()
+        cust_row1 = QHBoxLayout(self.cust_container1)
+        cust_row1.setSpacing(8)
+        # Prima riga: Name, Diagonal (in), DPI(PPI) - centrati
+        cust_row1.addStretch(1)
+        cust_row1.addWidget(self.custom_name_label)
+        cust_row1.addWidget(self.custom_name_edit)
+        cust_row1.addWidget(self.custom_inches_label)
+        cust_row1.addWidget(self.custom_inches)
+        cust_row1.addWidget(self.custom_dpi_label)
+        cust_row1.addWidget(self.custom_dpi_spin)
+        cust_row1.addStretch(1)
+        self.cust_container1.setVisible(False)
+
+        # Container riga 2 (nascosto di default)
+        self.cust_container2 = QWidget()
+        cust_row2 = QHBoxLayout(self.cust_container2)
+        cust_row2.setSpacing(8)
+        # Seconda riga: Width (px), Height (px), Save device - centrati
+        cust_row2.addStretch(1)
+        cust_row2.addWidget(self.custom_w_label)
+        cust_row2.addWidget(self.custom_w_spin)
+        cust_row2.addWidget(self.custom_h_label)
+        cust_row2.addWidget(self.custom_h_spin)
+        cust_row2.addWidget(self.save_custom_btn)
+        cust_row2.addStretch(1)
+        self.cust_container2.setVisible(False)
+
+        # Posiziona i container nascosti in griglia (righe 2 e 3)
+        self._opts_grid.addWidget(self.cust_container1, 2, 0, 1, 2)
+        self._opts_grid.addWidget(self.cust_container2, 3, 0, 1, 2)
+
     def _on_create_custom_clicked(self):
         """Mostra/nasconde i campi custom precompilati con il brand/model correnti."""
+        if not hasattr(self, 'cust_container1'):
+            self._build_custom_device_fields()
         try:
             # Toggle della visibilità dei container
             is_currently_visible = self.cust_container1.isVisible()
@@ -1578,16 +1752,9 @@ class MangaCompressorGUI(QWidget):
             return path
 
     def on_add_files(self):
-        t = self.i18n[self.language]
+        t = self._t
         files, _ = QFileDialog.getOpenFileNames(self, t['select_pdfs_title'], str(Path.cwd()), t['pdf_filter'])
-        for f in files:
-            # Mostra path completo
-            item = QListWidgetItem(f)
-            item.setData(Qt.UserRole, f)
-            item.setToolTip(f)
-            self.files_list.addItem(item)
-        # aggiorna numerazione
-        self._renumber_files()
+        self._add_file_items(files)
         self._update_files_buttons_state()
         if files:
             self._last_loaded_file = files[-1]
@@ -1635,8 +1802,12 @@ class MangaCompressorGUI(QWidget):
         self._update_files_buttons_state()
         self._validate_dirs_enable_start()
 
+    @Slot()
+    def _choose_out_dir(self):
+        self.choose_dir(self.out_dir_edit)
+
     def choose_dir(self, line_edit: QLineEdit):
-        t = self.i18n[self.language]
+        t = self._t
         d = QFileDialog.getExistingDirectory(self, t['choose_dir'], str(Path.cwd()))
         if d:
             line_edit.setText(str(Path(d).resolve()))
@@ -1650,7 +1821,7 @@ class MangaCompressorGUI(QWidget):
             it = self.files_list.item(i)
             files.append(it.data(Qt.UserRole) or it.text())
         if not files:
-            t = self.i18n[self.language]
+            t = self._t
             QMessageBox.warning(self, t['no_files_title'], t['add_at_least'])
             return
         # cartella output: richiedi selezione esplicita
@@ -1677,52 +1848,66 @@ class MangaCompressorGUI(QWidget):
         workers = self.workers_spin.value() or None
         ram_limit = self.ram_spin.value()
         if not 1 <= quality <= 100:
-            t = self.i18n[self.language]
+            t = self._t
             QMessageBox.warning(self, t['params_title'], t['quality_range'])
             return
         if not 1 <= P <= 24:
-            t = self.i18n[self.language]
+            t = self._t
             QMessageBox.warning(self, t['params_title'], t['max_colors_range'])
             return
         import multiprocessing as _mp
         cpu_count = max(1, _mp.cpu_count())
         if workers is not None and workers > cpu_count:
-            t = self.i18n[self.language]
+            t = self._t
             QMessageBox.warning(self, t['params_title'], t['workers_limit'].format(cpu=cpu_count))
             return
         if not 10 <= ram_limit <= 95:
-            t = self.i18n[self.language]
+            t = self._t
             QMessageBox.warning(self, t['params_title'], t['ram_range'])
             return
         if self.save_defaults_chk.isChecked():
             args = type('Args', (), {'device': device, 'mode': mode, 'quality': quality, 'max_colors': max_colors, 'workers': workers, 'ram_limit': ram_limit, 'suffix': None, 'out_dir': str(out_dir), 'ui_mode': self.ui_mode, 'language': self.language})
             try:
                 save_default_config(args)
-                self.on_log(self.i18n[self.language]['defaults_saved'])
+                self.on_log(self._t['defaults_saved'])
             except Exception as e:
-                self.on_log(self.i18n[self.language]['cannot_save_defaults'].format(err=e))
+                self.on_log(self._t['cannot_save_defaults'].format(err=e))
         # inizializza tracking progress globale
         self._init_progress_tracking(files)
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
-        self.log_list.clear()
+        self.on_clear_log()
         preset_key = self._current_preset_key()
         self.worker = CompressorWorker(files, out_dir, tmp_dir, device, mode, quality, max_colors, workers, ram_limit, self.signals, preset_key=preset_key)
-        self.worker.start()
+        self._worker_pool.start(self.worker)
+        self._progress_poll_timer.start()
 
+    @Slot(str)
     def on_log(self, msg: str):
-        if self.language == 'it':
-            repl = [('Processing:', 'Elaborazione:'), ('Done:', 'Fatto:'), ('Error:', 'Errore:'), ('Skipping invalid file:', 'Salto file non valido:'), ('Completed with', 'Completato con')]
-            for a, b in repl:
-                if msg.startswith(a):
-                    msg = b + msg[len(a):]
-                    break
-        self.log_list.addItem(msg)
+        for a, b in self._log_translations:
+            if msg.startswith(a):
+                msg = b + msg[len(a):]
+                break
+        self._pending_log.append(msg)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self):
+        if not self._pending_log:
+            return
+        self.log_list.addItems(list(self._pending_log))
+        self._pending_log.clear()
         self.log_list.scrollToBottom()
 
     def on_clear_log(self):
+        self._pending_log.clear()
         self.log_list.clear()
 
+    def _poll_worker_progress(self):
+        progress = self.worker.take_progress() if self.worker else None
+        if progress is not None:
+            self.on_progress(*progress)
+
     def on_progress(self, done: int, total: int, percent: float):
         # aggiorna stima durata del segmento successivo in modo adattivo
         try:
@@ -1751,6 +1936,7 @@ class MangaCompressorGUI(QWidget):
         except Exception:
             pass
 
+    @Slot(str, str)
     def on_file_done(self, file: str, output: str):
         self.on_log(f'Done: {file} -> {output}')
         # avanza al segmento successivo e aggiorna k/N
@@ -1777,11 +1963,14 @@ class MangaCompressorGUI(QWidget):
         except Exception:
             pass
 
+    @Slot(str)
     def on_error(self, message: str):
         self.on_log(f'Error: {message}')
 
+    @Slot()
     def on_all_done(self):
-        self.on_log(self.i18n[self.language]['all_done'])
+        self._progress_poll_timer.stop()
+        self.on_log(self._t['all_done'])
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         # forza completamento barra, mostra N/N
@@ -1810,13 +1999,30 @@ class MangaCompressorGUI(QWidget):
             if not tmp_dir and getattr(self, 'current_out_dir', None):
                 tmp_dir = Path(self.current_out_dir) / 'tmp'
             if tmp_dir:
-                tmp_dir = Path(tmp_dir)
-                if tmp_dir.exists():
-                    import shutil
-                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                self._discard_dir(Path(tmp_dir))
         except Exception:
             pass
 
+    @staticmethod
+    def _discard_dir(path: Path):
+        # rmtree gira nel pool, non nel thread GUI; la rinomina (istantanea) libera subito il nome,
+        # così un nuovo avvio che ricrea la stessa tmp non viene toccato dalla cancellazione in corso
+        try:
+            trash = path.with_name(f'{path.name}.del-{os.getpid()}-{time.monotonic_ns()}')
+            path.rename(trash)
+        except FileNotFoundError:
+            return
+        except OSError:
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        QThreadPool.globalInstance().start(lambda: shutil.rmtree(trash, ignore_errors=True))
+
+    def closeEvent(self, event):
+        # Il pool attende il job alla distruzione: chiedere lo stop evita di bloccare la chiusura
+        if self.worker:
+            self.worker.request_stop()
+        super().closeEvent(event)
+
     def eventFilter(self, obj, event):
         if obj is self.files_list and event.type() in (QEvent.DragEnter, QEvent.Drop, QEvent.DragMove):
             if event.type() == QEvent.DragEnter or event.type() == QEvent.DragMove:
@@ -1826,16 +2032,11 @@ class MangaCompressorGUI(QWidget):
                     return True
             elif event.type() == QEvent.Drop:
                 urls = event.mimeData().urls()
-                for u in urls:
-                    p = u.toLocalFile()
-                    if p.lower().endswith('.pdf') and Path(p).exists():
-                        # mostra path completo
-                        item = QListWidgetItem(p)
-                        item.setData(Qt.UserRole, p)
-                        item.setToolTip(p)
-                        self.files_list.addItem(item)
+                paths = [u.toLocalFile() for u in urls]
+                # Nessuno stat nel gestore del drop (lento su mount di rete): i file mancanti
+                # vengono saltati dal worker con "Skipping invalid file"
+                self._add_file_items([p for p in paths if p.lower().endswith('.pdf')])
                 event.acceptProposedAction()
-                self._renumber_files()
                 self._update_files_buttons_state()
                 if urls:
                     try:
@@ -2026,11 +2227,8 @@ class MangaCompressorGUI(QWidget):
             target = (Path.cwd() / 'compressed').resolve()
         if not target.exists():
             target.mkdir(parents=True, exist_ok=True)
-        if sys.platform.startswith('linux'):
-            os.system(f"xdg-open '{str(target)}' >/dev/null 2>&1 &")
-        elif sys.platform == 'darwin':
-            os.system(f"open '{str(target)}' >/dev/null 2>&1 &")
-        elif os.name == 'nt':
+        # Apertura tramite il servizio della piattaforma: niente shell da avviare né quoting del percorso
+        if not QDesktopServices.openUrl(QUrl.fromLocalFile(str(target))) and os.name == 'nt':
             os.startfile(str(target))
 
     def _load_presets(self):
@@ -2113,19 +2311,15 @@ class MangaCompressorGUI(QWidget):
                     self.suggestion_disclaimer.setVisible(False)
                 return
 
-            t = self.i18n.get(self.language, {})
+            t = self._t
             # Labels (fallbacks if missing in i18n)
             sel_label_key = t.get('estimate_selected') or t.get('estimate_label') or 'Estimated:'
             tot_label_key = t.get('estimate_total') or 'All files:'
 
             # Current preset and mapping
             preset_key = self._current_preset_key() or 'normal'
-            ratio_map = {
-                'ultra': 0.82, 'very_high': 0.72, 'high': 0.65,
-                'normal': 0.50, 'low': 0.38, 'very_low': 0.33, 'minimal': 0.28
-            }
             overhead = 180 * 1024
-            ratio = ratio_map.get(preset_key, 0.50)
+            ratio = self._PRESET_SIZE_RATIOS.get(preset_key, 0.50)
 
             # Helper for one file estimate (prefer precise, fallback to heuristic)
             has_precise_estimates = False
@@ -2160,7 +2354,7 @@ class MangaCompressorGUI(QWidget):
             sel_mb = sel_est / (1024 * 1024)
             # testo specifico per file N
             try:
-                prefix_tmpl = (self.i18n.get(self.language, {}) or {}).get('estimate_selected')
+                prefix_tmpl = self._t.get('estimate_selected')
             except Exception:
                 prefix_tmpl = None
             if not prefix_tmpl:
@@ -2211,17 +2405,16 @@ class MangaCompressorGUI(QWidget):
             extractor = PDFExtractor()
             pages = max(1, extractor.get_page_count(file_path))
             preset_key = self._current_preset_key() or 'normal'
-            ratio_map = {'ultra': 0.82, 'very_high': 0.72, 'high': 0.65, 'normal': 0.5, 'low': 0.38, 'very_low': 0.33, 'minimal': 0.28}
             bpp = total_bytes / pages
             overhead = 180 * 1024
-            ratio = ratio_map.get(preset_key, 0.5)
+            ratio = self._PRESET_SIZE_RATIOS.get(preset_key, 0.5)
             return int(pages * bpp * ratio + overhead)
         except Exception:
             return None
 
     def _preset_label_localized(self, key: str) -> str:
         try:
-            t = self.i18n.get(self.language, {})
+            t = self._t
             mapping = {
                 'ultra': t.get('preset_ultra', 'Ultra'),
                 'very_high': t.get('preset_very_high', 'Very High'),
@@ -2422,7 +2615,7 @@ class MangaCompressorGUI(QWidget):
 
     def _ensure_custom_device(self) -> Optional[str]:
         try:
-            if not getattr(self, 'use_custom_chk', None) or not self.use_custom_chk.isChecked():
+            if not getattr(self, 'use_custom_chk', None) or not self.use_custom_chk.isChecked() or not hasattr(self, 'custom_name_edit'):
                 return None
             name = (self.custom_name_edit.text() or 'custom').strip().replace(' ', '_')
             w = int(self.custom_w_spin.value())
@@ -2482,7 +2675,7 @@ class MangaCompressorGUI(QWidget):
 
     def _update_colors_label(self):
         try:
-            t = self.i18n[self.language]
+            t = self._t
             P = int(self.colors_spin.value())
             P = max(1, min(24, P))
             N = 2 ** P
@@ -2490,6 +2683,21 @@ class MangaCompressorGUI(QWidget):
         except Exception:
             self.lbl_colors.setText('Max colors (2^P, P=1..24):')
 
+    def _add_file_items(self, paths: list[str]):
+        # Inserimento e rinumerazione a ridisegno sospeso: un solo layout/repaint per tutto il gruppo
+        self.files_list.setUpdatesEnabled(False)
+        try:
+            for p in paths:
+                # Mostra path completo
+                item = QListWidgetItem(p)
+                item.setData(Qt.UserRole, p)
+                item.setToolTip(p)
+                self.files_list.addItem(item)
+            self._renumber_files()
+        finally:
+            self.files_list.setUpdatesEnabled(True)
+            self.files_list.viewport().update()
+
     def _renumber_files(self):
         """Aggiorna la lista con numerazione 1), 2), 3) accanto al percorso."""
         try:
@@ -2503,7 +2711,7 @@ class MangaCompressorGUI(QWidget):
 
     def _update_files_buttons_state(self):
         try:
-            rb = self.findChild(QPushButton, 'removeButton')
+            rb = self._named_buttons.get('removeButton')
             has_sel = bool(self.files_list.selectedItems())
             if rb:
                 rb.setEnabled(has_sel)
@@ -2535,7 +2743,7 @@ class MangaCompressorGUI(QWidget):
 
     def _prefill_custom_from_device(self, key: Optional[str]):
         try:
-            if not key or key not in DEVICE_PROFILES:
+            if not key or key not in DEVICE_PROFILES or not hasattr(self, 'custom_w_spin'):
                 return
             prof = DEVICE_PROFILES[key]
             w, h = prof.get('size', (1600, 2560))
@@ -2548,6 +2756,8 @@ class MangaCompressorGUI(QWidget):
 
 def main():
     app = QApplication(sys.argv)
+    # Livelli di zoom pre-ridotti delle anteprime: 128 MB invece dei 10 MB predefiniti
+    QPixmapCache.setCacheLimit(128 * 1024)
     gui = MangaCompressorGUI()
     gui.show()
     sys.exit(app.exec())
@@ -1,4 +1,6 @@
 import argparse
+import copy
+import functools
 import gc
 import io
 import json
@@ -8,22 +10,37 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, CancelledError, TimeoutError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, CancelledError, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Callable, Optional
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
+# Flussi immagine binari: niente ASCII85 sui JPEG già compressi (+25% di dimensione e molto tempo CPU)
+rl_config.useA85 = 0
 try:
-    import PyPDF2
-    HAS_PYPDF2 = True
+    import orjson
+    HAS_ORJSON = True
 except ImportError:
-    HAS_PYPDF2 = False
-    logging.warning('PyPDF2 non disponibile - funzionalità di split limitate')
+    HAS_ORJSON = False
 from modules import SystemOptimizer, MemoryMonitor, PDFExtractor, ImageProcessor, CompressionStats, TimingStats, DEVICE_PROFILES, COMPRESSION_MODES, DEFAULT_QUALITY, DEFAULT_MAX_COLORS
-from modules.worker_functions import process_image_worker
-from modules.config import ESTIMATED_MB_PER_PAGE
+from modules.worker_functions import process_image_worker, init_worker
+from modules.config import ESTIMATED_MB_PER_PAGE, GC_EVERY_BATCHES, GC_LOW_MEMORY_GB, GC_THRESHOLDS, AVAILABLE_RAM_TTL_SEC, MAX_CONCURRENT_PDFS, MAX_PAGES_PER_BATCH
+_INV_MB = 1.0 / (1024 * 1024)
+_INV_MIN = 1.0 / 60
+# Il gc è globale al processo e più PDF possono comprimere in parallelo da thread diversi:
+# si disattiva col primo batch attivo e si riattiva solo quando termina l'ultimo
+_gc_pause_lock = threading.Lock()
+_gc_pause_state = {'active': 0, 'was_enabled': False}
+
+@functools.lru_cache(maxsize=1)
+def _cached_available_gb(memory_monitor: MemoryMonitor, ts_bucket: int) -> float:
+    return memory_monitor.get_available_gb()
 
 class MangaCompressorModular:
 
@@ -40,13 +57,22 @@ class MangaCompressorModular:
         self._stop_checker = stop_checker or (lambda: False)
         self._stop_requested = False
         self._executor: Optional[ProcessPoolExecutor] = None
+        self._pool_owner = self
+        self._executor_lock = threading.Lock()
+        self._pool_stopped = False
+        self._cleanup_tmp_root = True
+        # spawn anche dalla GUI: un fork di un processo Qt multi-thread può bloccarsi nei figli
+        self._mp_context = mp.get_context('spawn')
+        self._worker_stop_event = self._mp_context.Event()
+        # Riutilizzato a ogni batch: chi implementa progress_cb deve copiarlo se lo conserva
+        self._progress_payload = {'event': 'progress', 'pages_processed': 0, 'pages_total': 0, 'percent': 0.0, 'pages_per_sec': 0.0, 'eta_sec': 0.0, 'elapsed_sec': 0.0}
         self.image_processor = ImageProcessor(self.device_profile, self.quality, self.max_colors, self.compression_mode)
         cpu_count = mp.cpu_count()
         if workers:
             self.compression_workers = max(1, workers)
         else:
             mem_per_worker_gb = ESTIMATED_MB_PER_PAGE * 1.5 / 1024.0
-            avail_gb = max(0.5, self.memory_monitor.get_available_gb())
+            avail_gb = max(0.5, self._available_gb())
             by_mem = int(avail_gb / mem_per_worker_gb) if mem_per_worker_gb > 0 else cpu_count
             hard_cap = 16 if cpu_count >= 8 else 8
             self.compression_workers = max(1, min(cpu_count, by_mem, hard_cap))
@@ -61,34 +87,75 @@ class MangaCompressorModular:
             pass
         return True
 
-    def _cancel_active_workers(self):
-        ex = self._executor
-        if not ex:
+    def _available_gb(self) -> float:
+        # La RAM libera cambia lentamente: una lettura ogni AVAILABLE_RAM_TTL_SEC basta per file e batch
+        return _cached_available_gb(self.memory_monitor, int(time.time() // AVAILABLE_RAM_TTL_SEC))
+
+    def sibling(self) -> 'MangaCompressorModular':
+        # Stessa configurazione e stesso pool di processi, ma statistiche proprie:
+        # permette di comprimere più PDF contemporaneamente da thread diversi
+        twin = copy.copy(self)
+        twin.stats = CompressionStats()
+        twin._progress_payload = dict(self._progress_payload)
+        twin._cleanup_tmp_root = False
+        return twin
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._pool_owner is not self:
+            return self._pool_owner._get_executor()
+        with self._executor_lock:
+            # Dopo uno stop nessun sibling deve ricreare il pool (né azzerare l'evento di stop)
+            if self._pool_stopped:
+                raise CancelledError('Compressione interrotta')
+            if self._executor is None:
+                self._worker_stop_event.clear()
+                processor_config = {'device_profile': self.device_profile, 'quality': self.quality, 'max_colors': self.max_colors, 'compression_mode': self.compression_mode}
+                self._executor = ProcessPoolExecutor(max_workers=self.compression_workers, mp_context=self._mp_context, initializer=init_worker, initargs=(processor_config, self._worker_stop_event))
+            return self._executor
+
+    def _drop_broken_executor(self, broken: ProcessPoolExecutor):
+        # Un worker morto (crash, OOM kill) rende il pool inutilizzabile: il prossimo
+        # _get_executor ne crea uno nuovo. Solo se nel frattempo un sibling non l'ha già sostituito
+        if self._pool_owner is not self:
+            self._pool_owner._drop_broken_executor(broken)
             return
+        with self._executor_lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
         try:
-            ex.shutdown(wait=False, cancel_futures=True)
+            broken.shutdown(wait=False, cancel_futures=True)
         except Exception:
             pass
+
+    def close(self):
+        if self._pool_owner is not self:
+            return
+        with self._executor_lock:
+            ex = self._executor
+            self._executor = None
+        if ex:
+            try:
+                ex.shutdown(wait=True, cancel_futures=True)
+            except Exception:
+                pass
+
+    def _cancel_active_workers(self):
+        if self._pool_owner is not self:
+            self._pool_owner._cancel_active_workers()
+            return
+        with self._executor_lock:
+            self._pool_stopped = True
+            ex = self._executor
+            self._executor = None
+            if not ex:
+                return
+            # I worker terminano l'immagine in corso e scartano quelle in coda
+            self._worker_stop_event.set()
         try:
-            procs = []
-            if hasattr(ex, '_processes'):
-                procs = list(getattr(ex, '_processes').values())
-            for p in procs:
-                try:
-                    p.terminate()
-                except Exception:
-                    pass
-            for p in procs:
-                try:
-                    p.join(timeout=0.1)
-                    if hasattr(p, 'is_alive') and p.is_alive():
-                        p.kill()
-                except Exception:
-                    pass
+            ex.shutdown(wait=False, cancel_futures=True)
         except Exception:
             pass
-        finally:
-            self._executor = None
 
     def compress_pdf(self, input_path: str, output_path: str) -> bool:
         input_path = Path(input_path)
@@ -98,7 +165,7 @@ class MangaCompressorModular:
             return False
         self.stats = CompressionStats()
         original_size = input_path.stat().st_size
-        self.stats.original_size_mb = original_size / (1024 * 1024)
+        self.stats.original_size_mb = original_size * _INV_MB
         base_tmp = self.tmp_dir
         base_tmp.mkdir(parents=True, exist_ok=True)
         with tempfile.TemporaryDirectory(prefix='manga_compress_', dir=str(base_tmp)) as temp_dir:
@@ -106,9 +173,7 @@ class MangaCompressorModular:
                 if self._stop_checker():
                     return False
                 success = self._compress_with_modules(input_path, output_path, temp_dir)
-                if success and output_path.exists():
-                    compressed_size = output_path.stat().st_size
-                    self.stats.compressed_size_mb = compressed_size / (1024 * 1024)
+                if success:
                     self._print_final_stats(current_file=input_path.name, output_file=output_path.name)
                     if self.progress_cb:
                         try:
@@ -125,11 +190,27 @@ class MangaCompressorModular:
                         pass
                 return False
             finally:
-                try:
-                    if base_tmp.exists() and (not any(base_tmp.iterdir())):
-                        base_tmp.rmdir()
-                except Exception:
-                    pass
+                self._safe_delete_files((self._partial_path(output_path),))
+                if self._cleanup_tmp_root:
+                    self.remove_empty_tmp_root()
+
+    def remove_empty_tmp_root(self):
+        try:
+            if self.tmp_dir.exists() and (not any(self.tmp_dir.iterdir())):
+                self.tmp_dir.rmdir()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _partial_path(output_path: Path) -> Path:
+        # Il file temporaneo sta accanto all'output finale, così os.replace è sempre un rename
+        return output_path.with_name(output_path.name + '.partial')
+
+    def _finalize_output(self, pdf_file, temp_output: Path, output_path: Path):
+        pdf_file.flush()
+        self.stats.compressed_size_mb = os.fstat(pdf_file.fileno()).st_size * _INV_MB
+        pdf_file.close()
+        os.replace(temp_output, output_path)
 
     def _compress_with_modules(self, input_path: Path, output_path: Path, temp_dir: str) -> bool:
         try:
@@ -140,9 +221,9 @@ class MangaCompressorModular:
                 return False
             logging.info(f'PDF contiene {total_pages} pagine')
             self.stats.pages_total = total_pages
-            available_gb = self.memory_monitor.get_available_gb()
+            available_gb = self._available_gb()
             optimal_batch = self.system_optimizer.get_optimal_batch_size(total_pages, available_gb)
-            batch_size = max(8, min(optimal_batch, 64))
+            batch_size = max(8, min(optimal_batch, MAX_PAGES_PER_BATCH))
             logging.info(f'Batch size scelto: {batch_size} pagine (ottimizzato per ridurre overhead di estrazione)')
             tmp_extract_dir = Path(temp_dir) / 'tmp'
             if tmp_extract_dir.exists():
@@ -151,35 +232,35 @@ class MangaCompressorModular:
                 except Exception:
                     pass
             tmp_extract_dir.mkdir(parents=True, exist_ok=True)
-            temp_output = os.path.join(temp_dir, 'output.pdf')
+            temp_output = self._partial_path(output_path)
             with open(temp_output, 'wb') as pdf_file:
                 canvas_obj = canvas.Canvas(pdf_file)
-                ranges = []
-                for start_page in range(1, total_pages + 1, batch_size):
-                    end_page = min(start_page + batch_size - 1, total_pages)
-                    ranges.append((start_page, end_page))
+                ranges = ((start_page, min(start_page + batch_size - 1, total_pages)) for start_page in range(1, total_pages + 1, batch_size))
                 prefetch_batches = min(3, max(1, self.compression_workers // 2))
                 logging.info(f'Prefetch di {prefetch_batches} batch di pagine per sovrapporre estrazione e compressione')
-                all_temp_files = []
-                with ThreadPoolExecutor(max_workers=prefetch_batches) as extractor_pool:
-                    futures = {}
-
-                    def submit_job(idx):
-                        s, e = ranges[idx]
-                        return extractor_pool.submit(self.pdf_extractor.extract_page_range, str(input_path), s, e, output_folder=str(tmp_extract_dir), fmt='png', paths_only=True)
-                    next_submit = 0
-                    next_process = 0
-                    while next_submit < len(ranges) and len(futures) < prefetch_batches:
-                        futures[next_submit] = submit_job(next_submit)
-                        next_submit += 1
-                    while next_process < len(ranges):
+                extract_fmt = self._pick_extract_fmt(tmp_extract_dir, batch_size * (prefetch_batches + 1))
+                # Le cartelle dei batch già scritti vengono rimosse fuori dal ciclo principale
+                with ThreadPoolExecutor(max_workers=prefetch_batches) as extractor_pool, ThreadPoolExecutor(max_workers=1) as cleanup_pool:
+                    pending = deque()
+
+                    def submit_next():
+                        # Ogni batch ha la sua sottocartella: pagine estratte e compresse spariscono con un solo rmtree
+                        page_range = next(ranges, None)
+                        if page_range is not None:
+                            s, e = page_range
+                            batch_dir = tmp_extract_dir / f'b{s}'
+                            batch_dir.mkdir()
+                            pending.append((extractor_pool.submit(self.pdf_extractor.extract_page_range, str(input_path), s, e, output_folder=str(batch_dir), fmt=extract_fmt, paths_only=True), batch_dir))
+                    for _ in range(prefetch_batches):
+                        submit_next()
+                    batch_num = 0
+                    while pending:
                         if self._stop_checker():
                             logging.info('Stop richiesto: interrompo pipeline')
                             return False
-                        future = futures.get(next_process)
-                        if future is None:
-                            break
-                        while True:
+                        future, batch_dir = pending.popleft()
+                        batch_num += 1
+                        while not future.done():
                             if self._stop_checker() or self._stop_requested:
                                 logging.info('Stop richiesto: interrompo pipeline')
                                 try:
@@ -188,145 +269,133 @@ class MangaCompressorModular:
                                     pass
                                 self._cancel_active_workers()
                                 return False
-                            try:
-                                image_paths = future.result(timeout=0.25)
-                                break
-                            except TimeoutError:
-                                continue
-                        del futures[next_process]
+                            wait((future,), timeout=0.25)
+                        image_paths = future.result()
                         batch_start = time.time()
-                        success = self._process_batch_modular(image_paths, canvas_obj, next_process + 1)
+                        success = self._run_batch(image_paths, canvas_obj, batch_num)
                         batch_time = time.time() - batch_start
                         if not success:
                             return False
                         self.stats.pages_processed += len(image_paths)
-                        all_temp_files.extend(image_paths)
-                        self._safe_delete_files(image_paths)
-                        gc.collect()
+                        cleanup_pool.submit(shutil.rmtree, batch_dir, ignore_errors=True)
+                        self._maybe_gc(batch_num)
                         self._update_progress(batch_time, len(image_paths))
-                        if next_submit < len(ranges):
-                            futures[next_submit] = submit_job(next_submit)
-                            next_submit += 1
-                        next_process += 1
+                        submit_next()
                 canvas_obj.save()
-            if self._stop_checker():
-                logging.info('Stop richiesto prima del salvataggio: annullo output')
-                return False
-            shutil.move(temp_output, output_path)
+                if self._stop_checker():
+                    logging.info('Stop richiesto prima del salvataggio: annullo output')
+                    return False
+                self._finalize_output(pdf_file, temp_output, output_path)
             return True
         except Exception as e:
             logging.error(f'Error during processing: {e}')
             return False
 
-    def _compress_large_pdf_chunked(self, input_path: Path, output_path: Path, temp_dir: str, total_pages: int) -> bool:
+    def _pick_extract_fmt(self, folder: Path, pages_in_flight: int) -> str:
+        # PPM non compresso evita encode PNG in pdftoppm e decode nei worker,
+        # ma occupa circa ESTIMATED_MB_PER_PAGE su disco per ogni pagina in volo
         try:
-            chunk_size = max(50, total_pages // self.compression_workers)
-            logging.info(f'Chunk size: {chunk_size} pagine per worker')
-            temp_output = os.path.join(temp_dir, 'output.pdf')
-            with open(temp_output, 'wb') as pdf_file:
-                canvas_obj = canvas.Canvas(pdf_file)
-                for start_page in range(1, total_pages + 1, chunk_size):
-                    end_page = min(start_page + chunk_size - 1, total_pages)
-                    chunk_pages = end_page - start_page + 1
-                    chunk_start_time = time.time()
-                    logging.info(f'Processando pagine {start_page}-{end_page} ({chunk_pages} pagine)...')
-                    logging.debug(f'Estraendo immagini pagine {start_page}-{end_page}')
-                    chunk_images = self.pdf_extractor.extract_page_range(str(input_path), start_page, end_page)
-                    if not chunk_images:
-                        logging.warning(f'Nessuna immagine estratta per pagine {start_page}-{end_page}')
-                        continue
-                    logging.debug(f'Estratte {len(chunk_images)} immagini, iniziando compressione...')
-                    batch_size = min(self.compression_workers * 2, 32)
-                    for i in range(0, len(chunk_images), batch_size):
-                        batch_images = chunk_images[i:i + batch_size]
-                        batch_num = (start_page - 1) // chunk_size + 1
-                        batch_start = time.time()
-                        success = self._process_batch_modular(batch_images, canvas_obj, batch_num)
-                        batch_time = time.time() - batch_start
-                        if not success:
-                            return False
-                        self.stats.pages_processed += len(batch_images)
-                        logging.debug(f'Batch di {len(batch_images)} immagini completato in {batch_time:.2f}s')
-                        gc.collect()
-                        self._update_progress(batch_time, len(batch_images))
-                    chunk_time = time.time() - chunk_start_time
-                    chunk_speed = chunk_pages / chunk_time
-                    logging.info(f'Chunk {start_page}-{end_page} completato in {chunk_time:.1f}s ({chunk_speed:.1f} pag/sec)')
-                    del chunk_images
-                    gc.collect()
-                canvas_obj.save()
-            shutil.move(temp_output, output_path)
-            return True
-        except Exception as e:
-            logging.error(f'Error during chunked processing: {e}')
-            return False
+            free_mb = shutil.disk_usage(folder).free / 1024 ** 2
+        except Exception:
+            return 'png'
+        if free_mb > 2 * pages_in_flight * ESTIMATED_MB_PER_PAGE:
+            logging.debug(f'Estrazione in PPM ({free_mb:.0f} MB liberi in {folder})')
+            return 'ppm'
+        return 'png'
+
+    def _run_batch(self, images, canvas_obj, batch_num: int) -> bool:
+        # Niente raccolte generazionali mentre ReportLab accumula oggetti pagina
+        with _gc_pause_lock:
+            if _gc_pause_state['active'] == 0:
+                _gc_pause_state['was_enabled'] = gc.isenabled()
+                gc.disable()
+            _gc_pause_state['active'] += 1
+        try:
+            return self._process_batch_modular(images, canvas_obj, batch_num)
+        finally:
+            with _gc_pause_lock:
+                _gc_pause_state['active'] -= 1
+                if _gc_pause_state['active'] == 0 and _gc_pause_state['was_enabled']:
+                    gc.enable()
+
+    def _maybe_gc(self, batch_num: int):
+        if batch_num % GC_EVERY_BATCHES == 0 or self._available_gb() < GC_LOW_MEMORY_GB:
+            gc.collect(1)
 
     def _process_batch_modular(self, images, canvas_obj, batch_num: int) -> bool:
         if not images:
             return True
-        logging.debug(f'Processando batch {batch_num} con {len(images)} immagini')
-        processor_config = {'device_profile': self.device_profile, 'quality': self.quality, 'max_colors': self.max_colors, 'compression_mode': self.compression_mode}
-        tasks = [(img, processor_config) for img in images]
-        compression_start = time.time()
-        logging.debug(f'Avviando compressione parallela con {self.compression_workers} workers...')
-        results = []
-        executor = ProcessPoolExecutor(max_workers=self.compression_workers)
-        self._executor = executor
+        # Le f-string di debug nel ciclo per pagina si formattano solo se il livello DEBUG è attivo
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        if debug:
+            logging.debug(f'Processando batch {batch_num} con {len(images)} immagini')
+            logging.debug(f'Avviando compressione parallela con {self.compression_workers} workers...')
+        batch_start = time.time()
+        # Ogni pagina viene scritta appena pronta: i worker continuano a comprimere
+        # le successive mentre ReportLab lavora sul thread principale
+        write_time = 0.0
+        written = 0
+        executor = results_iter = None
         try:
-            future_to_idx = {executor.submit(process_image_worker, task): idx for idx, task in enumerate(tasks)}
-            completed_count = 0
-            for future in as_completed(future_to_idx):
+            executor = self._get_executor()
+            # Più immagini per messaggio IPC; i risultati arrivano già in ordine di pagina
+            chunksize = max(1, len(images) // (4 * self.compression_workers))
+            results_iter = executor.map(process_image_worker, images, chunksize=chunksize)
+            for idx, (size, compressed) in enumerate(results_iter):
                 if self._stop_checker() or self._stop_requested:
                     logging.info('Stop richiesto durante compressione batch')
                     self._cancel_active_workers()
                     return False
-                idx = future_to_idx[future]
-                try:
-                    size, compressed_data = future.result()
-                    results.append((idx, size, compressed_data))
-                    completed_count += 1
-                    if completed_count % 10 == 0 or completed_count == len(tasks):
-                        logging.debug(f'Compresse {completed_count}/{len(tasks)} immagini del batch')
-                except CancelledError:
-                    logging.info('Future cancellata')
-                    return False
-                except Exception as e:
-                    logging.error(f'Error processing image {idx}: {e}')
+                write_start = time.time()
+                ok = self._write_page(canvas_obj, idx, size, compressed)
+                write_time += time.time() - write_start
+                if not ok:
                     return False
+                written = idx + 1
+                if debug and (written % 10 == 0 or written == len(images)):
+                    logging.debug(f'Compresse e scritte {written}/{len(images)} immagini del batch')
+        except CancelledError:
+            logging.info('Future cancellata')
+            return False
+        except BrokenProcessPool as e:
+            logging.error(f'Error processing image {written}: {e}')
+            self._drop_broken_executor(executor)
+            return False
+        except Exception as e:
+            logging.error(f'Error processing image {written}: {e}')
+            return False
         finally:
-            try:
-                executor.shutdown(wait=False, cancel_futures=True)
-            except Exception:
-                pass
-            self._executor = None
-        compression_time = time.time() - compression_start
+            if results_iter is not None:
+                results_iter.close()
+        compression_time = time.time() - batch_start - write_time
         self.stats.timing.compression_time += compression_time
-        compression_speed = len(images) / compression_time
-        logging.debug(f'Compressione completata in {compression_time:.2f}s ({compression_speed:.1f} img/sec)')
-        results.sort(key=lambda x: x[0])
-        write_start = time.time()
-        logging.debug(f'Scrivendo {len(results)} immagini nel PDF...')
-        for idx, size, compressed_data in results:
-            try:
-                img_reader = ImageReader(io.BytesIO(compressed_data))
-                img_width, img_height = size
-                if img_width > 0 and img_height > 0:
-                    # Imposta la dimensione della pagina esattamente uguale a quella dell'immagine
-                    # in modo da evitare bordi bianchi e mantenere le proporzioni/origine.
-                    page_width, page_height = img_width, img_height
-                    canvas_obj.setPageSize((page_width, page_height))
-                    # Disegna l'immagine a piena pagina senza ulteriori ridimensionamenti
-                    canvas_obj.drawImage(img_reader, 0, 0, page_width, page_height)
-                    canvas_obj.showPage()
-                else:
-                    logging.warning(f'Image {idx} has invalid dimensions: {size}')
-            except Exception as e:
-                logging.error(f'Error adding image {idx} to PDF: {e}')
-                return False
-        write_time = time.time() - write_start
         self.stats.timing.writing_time += write_time
-        write_speed = len(results) / write_time if write_time > 0 else 0
-        logging.debug(f'Scrittura completata in {write_time:.2f}s ({write_speed:.1f} img/sec)')
+        if debug:
+            compression_speed = len(images) / compression_time if compression_time > 0 else 0
+            write_speed = written / write_time if write_time > 0 else 0
+            logging.debug(f'Compressione completata in {compression_time:.2f}s ({compression_speed:.1f} img/sec)')
+            logging.debug(f'Scrittura completata in {write_time:.2f}s ({write_speed:.1f} img/sec)')
+        return True
+
+    def _write_page(self, canvas_obj, idx: int, size, compressed) -> bool:
+        try:
+            # Con un percorso ReportLab usa il nome file come chiave e copia il JPEG senza
+            # decodificarlo; un ImageReader invece verrebbe decodificato per calcolarne l'hash
+            img_source = compressed if isinstance(compressed, str) else ImageReader(io.BytesIO(compressed))
+            img_width, img_height = size
+            if img_width > 0 and img_height > 0:
+                # Imposta la dimensione della pagina esattamente uguale a quella dell'immagine
+                # in modo da evitare bordi bianchi e mantenere le proporzioni/origine.
+                page_width, page_height = img_width, img_height
+                canvas_obj.setPageSize((page_width, page_height))
+                # Disegna l'immagine a piena pagina senza ulteriori ridimensionamenti
+                canvas_obj.drawImage(img_source, 0, 0, page_width, page_height)
+                canvas_obj.showPage()
+            else:
+                logging.warning(f'Image {idx} has invalid dimensions: {size}')
+        except Exception as e:
+            logging.error(f'Error adding image {idx} to PDF: {e}')
+            return False
         return True
 
     def _safe_delete_files(self, paths):
@@ -341,11 +410,19 @@ class MangaCompressorModular:
         pages_per_sec = self.stats.pages_per_second()
         eta_sec = self.stats.eta_seconds()
         progress_percent = self.stats.pages_processed / self.stats.pages_total * 100
-        logging.info(f'Progress: {self.stats.pages_processed}/{self.stats.pages_total} ({progress_percent:.1f}%) - {pages_per_sec:.1f} pag/sec - ETA: {eta_sec / 60:.1f}min')
-        logging.debug(f'Batch completato in {batch_time:.2f}s ({batch_pages / batch_time:.1f} pag/sec)')
+        logging.info(f'Progress: {self.stats.pages_processed}/{self.stats.pages_total} ({progress_percent:.1f}%) - {pages_per_sec:.1f} pag/sec - ETA: {eta_sec * _INV_MIN:.1f}min')
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f'Batch completato in {batch_time:.2f}s ({batch_pages / batch_time:.1f} pag/sec)')
         if self.progress_cb:
             try:
-                self.progress_cb({'event': 'progress', 'pages_processed': self.stats.pages_processed, 'pages_total': self.stats.pages_total, 'percent': progress_percent, 'pages_per_sec': pages_per_sec, 'eta_sec': eta_sec, 'elapsed_sec': elapsed})
+                payload = self._progress_payload
+                payload['pages_processed'] = self.stats.pages_processed
+                payload['pages_total'] = self.stats.pages_total
+                payload['percent'] = progress_percent
+                payload['pages_per_sec'] = pages_per_sec
+                payload['eta_sec'] = eta_sec
+                payload['elapsed_sec'] = elapsed
+                self.progress_cb(payload)
             except Exception:
                 pass
 
@@ -364,7 +441,7 @@ class MangaCompressorModular:
         print(f'Compressed size: {self.stats.compressed_size_mb:.1f} MB')
         print(f'Compression ratio: {ratio:.1%}')
         print(f'Space saved: {saved_mb:.1f} MB')
-        print(f'Total time: {elapsed / 60:.1f} minutes')
+        print(f'Total time: {elapsed * _INV_MIN:.1f} minutes')
         print(f'Average speed: {self.stats.pages_per_second():.1f} pages/sec')
         if output_file:
             print(f'Output file: {output_file}')
@@ -372,6 +449,11 @@ class MangaCompressorModular:
             print('WARNING: Low compression effectiveness (< 5% reduction)')
         print('=' * 60)
 
+def _concurrent_pdf_count(compressor: MangaCompressorModular, n_files: int) -> int:
+    per_pdf_gb = MAX_PAGES_PER_BATCH * ESTIMATED_MB_PER_PAGE / 1024
+    by_mem = int(compressor._available_gb() // per_pdf_gb)
+    return max(1, min(n_files, MAX_CONCURRENT_PDFS, by_mem))
+
 def setup_logging(verbose: bool=False):
     level = logging.DEBUG if verbose else logging.INFO
     format_str = '%(asctime)s - %(levelname)s - %(message)s'
@@ -382,29 +464,52 @@ def save_default_config(args):
     existing = {}
     if config_file.exists():
         try:
-            with open(config_file, 'r') as f:
+            with open(config_file, 'r', encoding='utf-8') as f:
                 existing = json.load(f) or {}
         except Exception:
             existing = {}
     merged = {'device': getattr(args, 'device', existing.get('device', 'tablet_10')), 'mode': getattr(args, 'mode', existing.get('mode', 'auto')), 'quality': getattr(args, 'quality', existing.get('quality', DEFAULT_QUALITY)), 'max_colors': getattr(args, 'max_colors', existing.get('max_colors', DEFAULT_MAX_COLORS)), 'workers': getattr(args, 'workers', existing.get('workers', None)), 'ram_limit': getattr(args, 'ram_limit', existing.get('ram_limit', 75)), 'suffix': getattr(args, 'suffix', existing.get('suffix', None)), 'out_dir': getattr(args, 'out_dir', existing.get('out_dir', 'compressed')), 'tmp_dir': getattr(args, 'tmp_dir', existing.get('tmp_dir', 'tmp')), 'theme': getattr(args, 'theme', existing.get('theme', None)), 'language': getattr(args, 'language', existing.get('language', 'en')), 'ui_mode': getattr(args, 'ui_mode', existing.get('ui_mode', 'advanced'))}
-    with open(config_file, 'w') as f:
-        json.dump(merged, f, indent=2)
+    # File temporaneo + os.replace: un salvataggio interrotto (o concorrente) non lascia JSON troncato
+    fd, tmp_name = tempfile.mkstemp(dir=config_file.parent, prefix=config_file.name, suffix='.tmp')
+    try:
+        if HAS_ORJSON:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(merged, option=orjson.OPT_INDENT_2))
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_name, config_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _read_default_config.cache_clear()
     print(f'Default configuration saved to {config_file}')
 
-def load_default_config():
+@functools.lru_cache(maxsize=1)
+def _read_default_config():
     config_file = Path(__file__).parent / '.manga_compressor_defaults.json'
     if config_file.exists():
         try:
-            with open(config_file, 'r') as f:
+            with open(config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except:
             pass
     return {}
 
+def load_default_config():
+    # Copia: i chiamanti (GUI) modificano il dizionario restituito
+    return dict(_read_default_config() or {})
+_MKDIR_CACHE: set[Path] = set()
+
 def parse_output_filename(input_file, suffix=None, out_dir: str | None=None):
     input_path = Path(input_file)
     base_dir = Path(out_dir) if out_dir else input_path.parent
-    base_dir.mkdir(parents=True, exist_ok=True)
+    if base_dir not in _MKDIR_CACHE:
+        base_dir.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(base_dir)
     clean_suffix = None
     if suffix:
         clean_suffix = suffix[1:] if isinstance(suffix, str) and suffix.startswith('+') else suffix
@@ -414,6 +519,9 @@ def parse_output_filename(input_file, suffix=None, out_dir: str | None=None):
     return str(base_dir / output_name)
 
 def main():
+    # Soglia gen-2 alta: niente raccolte complete automatiche a metà batch.
+    # Impostata solo dalla CLI, la GUI mantiene le soglie predefinite
+    gc.set_threshold(*GC_THRESHOLDS)
     defaults = load_default_config()
     parser = argparse.ArgumentParser(
         description='Compress PDF manga by re-encoding images for a target device',
@@ -577,19 +685,38 @@ Modes
         suffix_to_use = args.suffix if getattr(args, 'suffix', None) else defaults.get('suffix', None)
         print(f'Batch mode: {len(normalized)} file(s)')
         print(f'Output directory: {out_dir}')
-        for in_path in normalized:
+        concurrency = _concurrent_pdf_count(compressor, len(normalized))
+
+        def compress_one(in_path: Path) -> bool:
             out_path = Path(parse_output_filename(str(in_path), suffix_to_use, out_dir=str(out_dir)))
             print('-' * 60)
             print(f'Processing: {in_path.name}')
-            ok = compressor.compress_pdf(str(in_path), str(out_path))
-            if not ok:
-                failures += 1
+            worker = compressor.sibling() if concurrency > 1 else compressor
+            return worker.compress_pdf(str(in_path), str(out_path))
+        try:
+            if concurrency > 1:
+                # Più PDF in parallelo sullo stesso pool di processi: il pool resta pieno
+                # anche durante avvio, ultimo batch e salvataggio di ciascun file
+                logging.info(f'Compressione di {concurrency} PDF in parallelo')
+                compressor._get_executor()
+                with ThreadPoolExecutor(max_workers=concurrency) as pdf_pool:
+                    failures = sum((1 for ok in pdf_pool.map(compress_one, normalized) if not ok))
+                compressor.remove_empty_tmp_root()
+            else:
+                for in_path in normalized:
+                    if not compress_one(in_path):
+                        failures += 1
+        finally:
+            compressor.close()
         if failures:
             logging.error(f'Completed with {failures} failure(s)')
             return 1
         return 0
     else:
-        success = compressor.compress_pdf(args.input_pdf, args.output_pdf)
+        try:
+            success = compressor.compress_pdf(args.input_pdf, args.output_pdf)
+        finally:
+            compressor.close()
         return 0 if success else 1
 if __name__ == '__main__':
     mp.set_start_method('spawn', force=True)
@@ -7,10 +7,25 @@ GRAYSCALE_COLOR_TOLERANCE = 10
 BW_THRESHOLD = 200
 BW_QUALITY = 95
 BW_DETECTION_THRESHOLD = 0.85
+BW_SAMPLE_PIXELS = 10000
+GRAYSCALE_SAMPLE_PIXELS = 2500
+BW_PNG_COMPRESS_LEVEL = 6
+# Progressive triplica il tempo di encode per circa il 4% di dimensione; optimize (Huffman) costa meno e resta attivo
+JPEG_OPTIMIZE = True
+JPEG_PROGRESSIVE = False
+JPEG_SUBSAMPLING = 2
+RESIZE_REDUCING_GAP = 1.5
 DEFAULT_RAM_LIMIT_PERCENT = 75
 MIN_BATCH_SIZE = 3
 MAX_BATCH_SIZE = 100
 ESTIMATED_MB_PER_PAGE = 12
+GC_EVERY_BATCHES = 8
+GC_LOW_MEMORY_GB = 0.5
+GC_THRESHOLDS = (700, 100, 100_000)
+AVAILABLE_RAM_TTL_SEC = 5
+MEMORY_PROBE_TTL_SEC = 0.1
+MAX_CONCURRENT_PDFS = 2
+MAX_PAGES_PER_BATCH = 64
 COMPRESSION_MODES = {
 	'auto': 'Automatically picks BW, Grayscale or Color per image for best size/quality',
 	'bw': 'Pure black/white (1-bit PNG) — best for line art and scanned B/W manga',
@@ -1,16 +1,19 @@
 import gc
 import logging
+import time
 try:
     import psutil
     HAS_PSUTIL = True
 except ImportError:
     HAS_PSUTIL = False
-from .config import DEFAULT_RAM_LIMIT_PERCENT, MIN_BATCH_SIZE, MAX_BATCH_SIZE, ESTIMATED_MB_PER_PAGE
+from .config import DEFAULT_RAM_LIMIT_PERCENT, MIN_BATCH_SIZE, MAX_BATCH_SIZE, ESTIMATED_MB_PER_PAGE, MEMORY_PROBE_TTL_SEC
 
 class MemoryMonitor:
 
     def __init__(self, ram_limit_percent: int=DEFAULT_RAM_LIMIT_PERCENT):
         self.ram_limit_percent = ram_limit_percent
+        self._last_probe_ts = float('-inf')
+        self._last_used_gb = 0.0
         if HAS_PSUTIL:
             total_ram = psutil.virtual_memory().total
             self.total_ram_gb = total_ram / 1024 ** 3
@@ -23,7 +26,12 @@ class MemoryMonitor:
 
     def get_current_usage_gb(self) -> float:
         if HAS_PSUTIL:
-            return psutil.virtual_memory().used / 1024 ** 3
+            # Letture ravvicinate riusano l'ultimo valore invece di rileggere /proc/meminfo
+            now = time.monotonic()
+            if now - self._last_probe_ts > MEMORY_PROBE_TTL_SEC:
+                self._last_used_gb = psutil.virtual_memory().used / 1024 ** 3
+                self._last_probe_ts = now
+            return self._last_used_gb
         else:
             return self.total_ram_gb * 0.4
 
@@ -44,7 +52,8 @@ class MemoryMonitor:
         return optimal_size
 
     def force_gc(self):
-        gc.collect()
+        gc.collect(1)
+        self._last_probe_ts = float('-inf')
         if HAS_PSUTIL:
             current_gb = self.get_current_usage_gb()
             logging.debug(f'Memoria dopo GC: {current_gb:.1f}GB')
\ No newline at end of file
@@ -2,7 +2,7 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict
 
-@dataclass
+@dataclass(slots=True)
 class TimingStats:
     extraction_time: float = 0.0
     compression_time: float = 0.0
@@ -15,13 +15,13 @@ class TimingStats:
     def get_breakdown(self) -> Dict[str, float]:
         return {'extraction': self.extraction_time, 'compression': self.compression_time, 'writing': self.writing_time, 'pdf_analysis': self.pdf_analysis_time, 'image_processing': self.image_processing_time, 'memory_management': self.memory_management_time, 'total': self.total_time}
 
-@dataclass
+@dataclass(slots=True)
 class CompressionStats:
     pages_processed: int = 0
     pages_total: int = 0
     original_size_mb: float = 0.0
     compressed_size_mb: float = 0.0
-    start_time: float = field(default_factory=time.time)
+    start_time: float = field(default_factory=time.monotonic)
     timing: TimingStats = field(default_factory=TimingStats)
 
     def compression_ratio(self) -> float:
@@ -36,7 +36,7 @@ class CompressionStats:
         return self.compression_ratio() < 0.95
 
     def elapsed_time(self) -> float:
-        return time.time() - self.start_time
+        return time.monotonic() - self.start_time
 
     def pages_per_second(self) -> float:
         elapsed = self.elapsed_time()
@@ -1,41 +1,58 @@
 import gc
+import os
 import time
 from typing import Tuple, Any
 from PIL import Image
+from concurrent.futures import CancelledError
 from .image_processor import ImageProcessor
+from .config import GC_THRESHOLDS
+_processor = None
+_stop_event = None
 
-def process_image_worker(args) -> Tuple[Tuple[int, int], bytes]:
-    image_or_path, processor_config = args
-    processor = ImageProcessor(device_profile=processor_config['device_profile'], quality=processor_config['quality'], max_colors=processor_config['max_colors'], compression_mode=processor_config['compression_mode'])
+def init_worker(processor_config, stop_event=None):
+    # La configurazione arriva una sola volta per processo invece che con ogni task
+    global _processor, _stop_event
+    # Soglia gen-2 alta: niente raccolte complete automatiche a metà immagine
+    gc.set_threshold(*GC_THRESHOLDS)
+    _processor = ImageProcessor(device_profile=processor_config['device_profile'], quality=processor_config['quality'], max_colors=processor_config['max_colors'], compression_mode=processor_config['compression_mode'])
+    _stop_event = stop_event
+
+def _write_compressed(image_path: str, data: bytes) -> str:
+    # L'estensione deve riflettere il formato: ReportLab incorpora i .jpg così come sono
+    ext = '.jpg' if data[:2] == b'\xff\xd8' else '.png'
+    out_path = os.path.splitext(image_path)[0] + '.c' + ext
+    fd = os.open(out_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return out_path
+
+def process_image_worker(image_or_path) -> Tuple[Tuple[int, int], Any]:
+    # Con un percorso in input il risultato resta su disco accanto all'originale e
+    # al processo padre torna solo il percorso, non i byte compressi
+    if _stop_event is not None and _stop_event.is_set():
+        raise CancelledError()
     if isinstance(image_or_path, str):
         image = Image.open(image_or_path)
     else:
         image = image_or_path
-    optimized = processor.optimize_image(image)
-    size, compressed = processor.compress_image(optimized)
+    optimized = _processor.optimize_image(image)
+    size, compressed = _processor.compress_image(optimized)
     try:
         image.close()
     except Exception:
         pass
     del optimized, image
     gc.collect()
+    if isinstance(image_or_path, str):
+        return (size, _write_compressed(image_or_path, compressed))
     return (size, compressed)
 
-def process_image_worker_with_timing(args) -> Tuple[Tuple[int, int], bytes, float]:
+def process_image_worker_with_timing(image_or_path) -> Tuple[Tuple[int, int], Any, float]:
     start_time = time.time()
-    image_or_path, processor_config = args
-    processor = ImageProcessor(device_profile=processor_config['device_profile'], quality=processor_config['quality'], max_colors=processor_config['max_colors'], compression_mode=processor_config['compression_mode'])
-    if isinstance(image_or_path, str):
-        image = Image.open(image_or_path)
-    else:
-        image = image_or_path
-    optimized = processor.optimize_image(image)
-    size, compressed = processor.compress_image(optimized)
-    try:
-        image.close()
-    except Exception:
-        pass
-    del optimized, image
-    gc.collect()
+    size, compressed = process_image_worker(image_or_path)
     processing_time = time.time() - start_time
-    return (size, compressed, processing_time)
\ No newline at end of file
+    return (size, compressed, processing_time)